@@ -10,6 +10,10 @@ if not __package__ and not hasattr(sys, "frozen"):
 
 
 if __name__ == "__main__":
+    from multiprocessing import freeze_support
+
+    freeze_support()  # the binders render pages in worker processes
+
     from lncrawl import main
 
     main()
@@ -0,0 +1,7 @@
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+
+def calibre_worker_script() -> str:
+    return str(ROOT / "worker.py")
@@ -0,0 +1,44 @@
+"""
+Runs inside `calibre-debug` to convert many ebooks with a single process.
+
+Reads one job per line from stdin as {"id": ..., "args": [...]}, where args
+are the arguments for `ebook-convert`, and writes {"id": ..., "ok": ...,
+"error": ...} to stdout for each of them. Anything else calibre prints is
+sent to stderr.
+"""
+import json
+import os
+import sys
+import traceback
+
+from calibre.ebooks.conversion.cli import main as ebook_convert
+
+
+def run():
+    results = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    def reply(**data):
+        results.write(json.dumps(data) + "\n")
+        results.flush()
+
+    reply(ready=True)
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        error = None
+        try:
+            code = ebook_convert(["ebook-convert"] + list(job["args"]))
+            if code:
+                error = "Exited with code %s" % code
+        except SystemExit as e:
+            if e.code:
+                error = "Exited with code %s" % e.code
+        except BaseException:
+            error = traceback.format_exc()
+        reply(id=job["id"], ok=error is None, error=error)
+
+
+run()
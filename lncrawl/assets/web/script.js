@@ -19,12 +19,43 @@ window.addEventListener("keyup", function (evt) {
   }
 });
 
+// Load the chapter list from toc.js when the TOC select is first used
+var tocRequested = false;
+function loadToc() {
+  if (tocRequested) return;
+  tocRequested = true;
+  const script = document.createElement("script");
+  script.src = "toc.js";
+  script.onload = fillTocOptions;
+  document.head.appendChild(script);
+}
+
+function fillTocOptions() {
+  const toc = window.LNCRAWL_TOC || [];
+  document.querySelectorAll("select.toc").forEach((select) => {
+    const current = select.value;
+    const options = document.createDocumentFragment();
+    toc.forEach(([value, title]) => {
+      const option = document.createElement("option");
+      option.value = value;
+      option.textContent = title;
+      option.selected = value === current;
+      options.appendChild(option);
+    });
+    select.innerHTML = "";
+    select.appendChild(options);
+  });
+}
+
 // Handle next TOC select
 function addTocSelectListener() {
   document.querySelectorAll("select.toc").forEach((select) => {
     select.addEventListener("input", (evt) => {
       window.location.href = evt.currentTarget.value;
     });
+    ["focus", "mouseenter", "touchstart"].forEach((name) => {
+      select.addEventListener(name, loadToc, { once: true });
+    });
   });
 }
 
@@ -2,6 +2,10 @@
 To bind into ebooks
 """
 import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Tuple
 
 from .epub import make_epubs
 from .web import make_webs
@@ -10,6 +14,8 @@ from .calibre import make_calibres
 
 logger = logging.getLogger(__name__)
 
+MAX_BIND_WORKERS = 4
+
 depends_on_none = [
     "json",
     "epub",
@@ -37,8 +43,35 @@ depends_on_epub = [
 available_formats = depends_on_none + depends_on_epub
 
 
-def generate_books(app, data):
-    app.progress = 0
+def bind_workers() -> int:
+    """Number of books to bind or convert at the same time"""
+    from ..core.arguments import get_args
+
+    workers = getattr(get_args(), "bind_workers", 0) or 0
+    if workers <= 0:
+        workers = min(MAX_BIND_WORKERS, os.cpu_count() or 1)
+    return workers
+
+
+def bind_artifact(app, fmt, volume, chapters, epub_files=None):
+    """Binds the chapters of a single book into the given format"""
+    start = time.perf_counter()
+    if fmt == "text":
+        files = make_texts(app, {volume: chapters})
+    elif fmt == "web":
+        files = make_webs(app, {volume: chapters})
+    elif fmt == "epub":
+        files = make_epubs(app, {volume: chapters})
+    elif fmt in depends_on_epub:
+        files = make_calibres(app, epub_files, fmt)
+    else:
+        files = []
+    return files, time.perf_counter() - start
+
+
+def generate_books(app, data, track_progress=True):
+    if track_progress:
+        app.progress = 0
     out_formats = app.output_formats
     if not out_formats:
         out_formats = {}
@@ -49,26 +82,61 @@ def generate_books(app, data):
     after_epub = [x for x in depends_on_epub if out_formats[x]]
     need_epub = "epub" if len(after_epub) else None
     after_any = [x for x in depends_on_none if out_formats[x] or x == need_epub]
-    formats_to_generate = after_any + after_epub
+    after_any = [x for x in after_any if x != "json"]  # exported from the store
+
+    # Every book of every format is a separate task. The conversions of a
+    # book are started as soon as its epub is ready.
+    total = len(data) * (len(after_any) + len(after_epub))
+    results: Dict[str, Dict[str, list]] = {}
+    tasks: Dict[Future, Tuple[str, str]] = {}
+    executor = ThreadPoolExecutor(bind_workers(), thread_name_prefix="lncrawl_bind")
+
+    def _submit(fmt, volume, *args):
+        future = executor.submit(bind_artifact, app, fmt, volume, data[volume], *args)
+        tasks[future] = (fmt, volume)
+        return future
 
-    # Generate output files
     progress = 0
+    try:
+        pending = set(
+            _submit(fmt, volume) for volume in data.keys() for fmt in after_any
+        )
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                fmt, volume = tasks[future]
+                files = None
+                try:
+                    files, elapsed = future.result()
+                    if files:
+                        logger.info("Generated %s of %s in %.2fs", fmt, volume, elapsed)
+                except Exception as err:
+                    logger.exception('Failed to generate "%s": %s' % (fmt, err))
+
+                progress += 1
+                results.setdefault(fmt, {})[volume] = files
+                if fmt == "epub":
+                    for out_fmt in after_epub:
+                        if files:
+                            pending.add(_submit(out_fmt, volume, files))
+                        else:
+                            progress += 1
+
+            if track_progress and total:
+                app.progress = 100 * progress / total
+    finally:
+        for future in tasks:
+            future.cancel()
+        executor.shutdown(wait=False)
+
     outputs = dict()
-    for fmt in formats_to_generate:
-        try:
-            if fmt == "text":
-                outputs[fmt] = make_texts(app, data)
-            elif fmt == "web":
-                outputs[fmt] = make_webs(app, data)
-            elif fmt == "epub":
-                outputs[fmt] = make_epubs(app, data)
-            elif fmt in depends_on_epub:
-                outputs[fmt] = make_calibres(app, outputs["epub"], fmt)
-
-        except Exception as err:
-            logger.exception('Failed to generate "%s": %s' % (fmt, err))
-        finally:
-            progress += 1
-            app.progress = 100 * progress / len(formats_to_generate)
+    for fmt in after_any + after_epub:
+        if fmt in results:
+            outputs[fmt] = [
+                file
+                for volume in data.keys()
+                for file in results[fmt].get(volume) or []
+                if file
+            ]
 
     return outputs
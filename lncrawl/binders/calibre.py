@@ -1,12 +1,27 @@
+import atexit
+import json
 import logging
 import os
 import subprocess
+from itertools import count
+from queue import Empty, Queue
+from threading import Lock
+from typing import List, Optional
+
+from ..assets.calibre import calibre_worker_script
 
 logger = logging.getLogger(__name__)
 
 EBOOK_CONVERT = "ebook-convert"
+CALIBRE_DEBUG = "calibre-debug"
 CALIBRE_LINK = "https://calibre-ebook.com/download"
 
+__probe_lock = Lock()
+__is_available: Optional[bool] = None
+
+__use_workers = True
+__idle_workers: "Queue[CalibreWorker]" = Queue()
+
 
 def run_ebook_convert(*args):
     """
@@ -30,6 +45,110 @@ def run_ebook_convert(*args):
         return False
 
 
+def is_calibre_available() -> bool:
+    """Checks once whether `ebook-convert` can be called"""
+    global __is_available
+    with __probe_lock:
+        if __is_available is None:
+            __is_available = run_ebook_convert("--version")
+        return __is_available
+
+
+class CalibreWorker:
+    """
+    A long running `calibre-debug` process that converts ebooks one after
+    another, so that the startup time of calibre is paid only once.
+    """
+
+    _job_ids = count(1)
+
+    def __init__(self) -> None:
+        isdebug = os.getenv("debug_mode") == "yes"
+        self.process = subprocess.Popen(
+            [CALIBRE_DEBUG, "-e", calibre_worker_script()],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None if isdebug else subprocess.DEVNULL,
+            encoding="utf-8",
+        )
+        self._read()  # wait until it is ready
+
+    def convert(self, args: List[str]) -> bool:
+        job_id = next(self._job_ids)
+        self._write({"id": job_id, "args": args})
+        result = self._read()
+        if result.get("id") != job_id:
+            raise ValueError("Unexpected reply from calibre worker")
+        if result.get("error"):
+            logger.debug("Calibre worker error: %s", result["error"])
+        return bool(result.get("ok"))
+
+    def close(self) -> None:
+        try:
+            if self.process.stdin:
+                self.process.stdin.close()
+            self.process.wait(5)
+        except Exception:
+            self.process.kill()
+
+    def _write(self, data: dict) -> None:
+        assert self.process.stdin
+        self.process.stdin.write(json.dumps(data) + "\n")
+        self.process.stdin.flush()
+
+    def _read(self) -> dict:
+        assert self.process.stdout
+        line = self.process.stdout.readline()
+        if not line:
+            raise ChildProcessError("Calibre worker has exited")
+        return json.loads(line)
+
+
+def __get_worker() -> Optional[CalibreWorker]:
+    global __use_workers
+    if not __use_workers:
+        return None
+    try:
+        return __idle_workers.get_nowait()
+    except Empty:
+        pass
+    try:
+        return CalibreWorker()
+    except Exception as e:
+        __use_workers = False
+        logger.info("Calling %s for each conversion. Reason: %s", EBOOK_CONVERT, e)
+        return None
+
+
+def __close_workers() -> None:
+    while True:
+        try:
+            __idle_workers.get_nowait().close()
+        except Empty:
+            break
+
+
+atexit.register(__close_workers)
+
+
+def convert_ebook(*args) -> None:
+    """
+    Converts an ebook in a long running calibre worker, or by calling
+    `ebook-convert` if the worker is not available.
+    """
+    worker = __get_worker()
+    if worker:
+        try:
+            worker.convert(list(args))
+            __idle_workers.put(worker)
+            return
+        except Exception as e:
+            logger.debug("Calibre worker failed: %s", e)
+            worker.close()
+
+    run_ebook_convert(*args)
+
+
 def epub_to_calibre(app, epub_file, out_fmt):
     if not os.path.exists(epub_file):
         return None
@@ -77,7 +196,7 @@ def epub_to_calibre(app, epub_file, out_fmt):
             '<p style="text-align:center; color:#555; font-size:0.9em">⦗ _TITLE_ &mdash; _SECTION_ ⦘</p>',
         ]
 
-    run_ebook_convert(*args)
+    convert_ebook(*args)
 
     if os.path.exists(out_file):
         print("Created: %s" % out_file_name)
@@ -91,7 +210,7 @@ def make_calibres(app, epubs, out_fmt):
     if out_fmt == "epub" or not epubs:
         return epubs
 
-    if not run_ebook_convert("--version"):
+    if not is_calibre_available():
         logger.error("Install Calibre to generate %s: %s", out_fmt, CALIBRE_LINK),
         return
 
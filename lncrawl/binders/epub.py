@@ -1,11 +1,14 @@
 import logging
 import os
-from typing import Dict, List
-
-from minify_html import minify
+import zipfile
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from ..assets.epub import epub_chapter_xhtml, epub_cover_xhtml, epub_style_css
 from ..models.chapter import Chapter
+from .epub_writer import EpubStreamWriter
+from .manifest import BindManifest, book_key, content_digest, file_digest
+from .render import minify_in_order
 
 try:
     from ebooklib import epub
@@ -18,6 +21,43 @@ logger = logging.getLogger(__name__)
 COVER_IMAGE_NAME = "cover.jpg"
 STYLE_FILE_NAME = "style.css"
 PROJECT_URL = "https://github.com/dipu-bd/lightnovel-crawler"
+IMAGE_MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".webp": "image/webp",  # a core media type since epub 3.3
+}
+
+
+@contextmanager
+def previous_bind(
+    file_path: str, previous_file: Optional[str]
+) -> Iterator[Optional[zipfile.ZipFile]]:
+    """
+    Keeps the previous bind of an epub aside while the new one is written,
+    so that the unchanged entries can be copied from it. It may have another
+    name, if the chapters have changed. It is restored if the new one could
+    not be written, and removed otherwise.
+    """
+    previous_path = file_path + ".old"
+    if not previous_file or not os.path.isfile(previous_file):
+        yield None
+        return
+
+    os.replace(previous_file, previous_path)
+    previous_epub = None
+    try:
+        previous_epub = zipfile.ZipFile(previous_path)
+    except (OSError, zipfile.BadZipFile) as e:
+        logger.debug("Can not reuse the previous epub: %s", e)
+
+    try:
+        yield previous_epub
+    finally:
+        if previous_epub:
+            previous_epub.close()
+        if os.path.isfile(file_path):
+            os.remove(previous_path)
+        else:
+            os.replace(previous_path, previous_file)
 
 
 def bind_epub_book(
@@ -33,6 +73,12 @@ def bind_epub_book(
     suffix: str,  # suffix to the file name
     no_suffix_after_filename: bool = False,
     is_rtl: bool = False,
+    # yields the chapters with their bodies, when they are not in memory
+    iter_bodies: Optional[
+        Callable[[List[Chapter]], Iterable[Tuple[Chapter, str]]]
+    ] = None,
+    # digests of the previous bind, to copy the unchanged entries from it
+    manifest: Optional[BindManifest] = None,
 ):
     logger.info("Binding epub for %s", book_title)
 
@@ -44,117 +90,157 @@ def bind_epub_book(
     book.set_identifier(output_path + suffix)
     # book.set_direction("rtl" if is_rtl else "default")
 
-    logger.debug("Adding %s", STYLE_FILE_NAME)
-    style_item = epub.EpubItem(
-        file_name=STYLE_FILE_NAME,
-        content=epub_style_css(),
-        media_type="text/css",
-    )
-    book.add_item(style_item)
-
-    logger.debug("Adding templates")
-    book.set_template("cover", epub_cover_xhtml())
-    book.set_template("chapter", epub_chapter_xhtml())
-
-    logger.debug("Adding cover image")
-    assert book_cover and os.path.isfile(book_cover), "No book cover"
-    with open(book_cover, "rb") as fp:
-        book.set_cover(COVER_IMAGE_NAME, fp.read(), create_page=True)
-
-    logger.debug("Creating intro page")
-    intro_html = f"""
-    <div id="intro">
-        <div class="header">
-            <h1>{novel_title or "N/A"}</h1>
-            <h3>{novel_author}</h3>
-        </div>
-        <img class="cover" src="{COVER_IMAGE_NAME}">
-        <div class="footer">
-            <b>Source:</b> <a href="{novel_url}">{novel_url}</a>
-            <br>
-            <i>Generated by <b>
-            <a href="{PROJECT_URL}">Lightnovel Crawler</a></b></i>
-        </div>
-    </div>
-    """
-    intro_item = epub.EpubHtml(
-        title="Intro Page",
-        file_name="intro.xhtml",
-        content=intro_html,
-    )
-    intro_item.add_link(
-        href=STYLE_FILE_NAME,
-        rel="stylesheet",
-        type="text/css",
-    )
-    book.add_item(intro_item)
-
-    logger.debug("Creating chapter contents")
-    toc = []
-    spine = ["cover", intro_item, "nav"]
-    for chapters in chapter_groups:
-        first_chapter = chapters[0]
-        volume_id = first_chapter.volume
-        volume_title = first_chapter.volume_title or f"Book ${volume_id}"
-        volume_html = f"""
-        <div id="volume">
-            <h1>{volume_title}</h1>
+    file_name = good_file_name
+    if not no_suffix_after_filename:
+        file_name += " " + suffix
+
+    epub_path = os.path.join(output_path, "epub")
+    file_path = os.path.join(epub_path, file_name + ".epub")
+    os.makedirs(epub_path, exist_ok=True)
+
+    logger.info("Writing %s", file_path)
+    chapter_template = content_digest(epub_chapter_xhtml())
+    previous_file = None
+    if manifest:
+        previous_file = manifest.previous_output or file_path
+    with previous_bind(file_path, previous_file) as previous_epub, EpubStreamWriter(
+        file_path, book
+    ) as writer:
+        logger.debug("Adding %s", STYLE_FILE_NAME)
+        style_item = epub.EpubItem(
+            file_name=STYLE_FILE_NAME,
+            content=epub_style_css(),
+            media_type="text/css",
+        )
+        writer.add_item(style_item)
+
+        logger.debug("Adding templates")
+        book.set_template("cover", epub_cover_xhtml())
+        book.set_template("chapter", epub_chapter_xhtml())
+
+        logger.debug("Adding cover image")
+        assert book_cover and os.path.isfile(book_cover), "No book cover"
+        book.set_cover(COVER_IMAGE_NAME, b"", create_page=True)
+        for item in book.get_items():
+            if isinstance(item, epub.EpubCover):
+                writer.write_item(item, source_file=book_cover)
+            else:
+                writer.write_item(item)
+
+        logger.debug("Creating intro page")
+        intro_html = f"""
+        <div id="intro">
+            <div class="header">
+                <h1>{novel_title or "N/A"}</h1>
+                <h3>{novel_author}</h3>
+            </div>
+            <img class="cover" src="{COVER_IMAGE_NAME}">
+            <div class="footer">
+                <b>Source:</b> <a href="{novel_url}">{novel_url}</a>
+                <br>
+                <i>Generated by <b>
+                <a href="{PROJECT_URL}">Lightnovel Crawler</a></b></i>
+            </div>
         </div>
         """
-        volume_item = epub.EpubHtml(
-            file_name=f"volumes/{volume_id}.xhtml",
-            content=volume_html,
-            title=volume_title,
+        intro_item = epub.EpubHtml(
+            title="Intro Page",
+            file_name="intro.xhtml",
+            content=intro_html,
+        )
+        intro_item.add_link(
+            href=STYLE_FILE_NAME,
+            rel="stylesheet",
+            type="text/css",
         )
-        book.add_item(volume_item)
-        spine.append(volume_item)
+        writer.add_item(intro_item)
 
-        volume_contents = []
-        for chapter in chapters:
-            chapter_html = minify(
-                str(chapter["body"]),
-                minify_css=True,
-                minify_js=True,
-            )
-            chapter_item = epub.EpubHtml(
-                file_name=f"chapters/{chapter.id}.xhtml",
-                content=chapter_html,
-                title=chapter["title"],
+        logger.debug("Creating chapter contents")
+        toc = []
+        spine = ["cover", intro_item, "nav"]
+        for chapters in chapter_groups:
+            first_chapter = chapters[0]
+            volume_id = first_chapter.volume
+            volume_title = first_chapter.volume_title or f"Book ${volume_id}"
+            volume_html = f"""
+            <div id="volume">
+                <h1>{volume_title}</h1>
+            </div>
+            """
+            volume_item = epub.EpubHtml(
+                file_name=f"volumes/{volume_id}.xhtml",
+                content=volume_html,
+                title=volume_title,
             )
-            book.add_item(chapter_item)
-            spine.append(chapter_item)
-            volume_contents.append(chapter_item)
-
-        volume_section = epub.Section(volume_title, href=volume_item.file_name)
-        toc.append([volume_section, volume_contents])
-
-    book.toc = toc
-    book.spine = spine
-    book.add_item(epub.EpubNcx())
-    book.add_item(epub.EpubNav())
-
-    logger.debug("Adding images")
-    for image_path in images:
-        filename = os.path.basename(image_path)
-        with open(image_path, "rb") as fp:
+            writer.add_item(volume_item)
+            spine.append(volume_item)
+
+            if iter_bodies:
+                bodies = iter_bodies(chapters)
+            else:
+                bodies = ((chapter, chapter["body"]) for chapter in chapters)
+
+            def _pages(bodies=bodies):
+                for chapter, body in bodies:
+                    body = str(body)
+                    file_name = f"chapters/{chapter.id}.xhtml"
+                    digest = content_digest(chapter_template, chapter["title"], body)
+                    if (
+                        manifest
+                        and manifest.is_unchanged(file_name, digest)
+                        and writer.can_copy(file_name, previous_epub)
+                        and "epub:type" not in body
+                    ):
+                        yield (chapter, True), ""  # copied from the previous bind
+                    else:
+                        yield (chapter, False), body
+
+            volume_contents = []
+            pages = minify_in_order(_pages(), len(chapters))
+            for (chapter, unchanged), chapter_html in pages:
+                chapter_item = epub.EpubHtml(
+                    file_name=f"chapters/{chapter.id}.xhtml",
+                    content=chapter_html,
+                    title=chapter["title"],
+                )
+                if unchanged:
+                    writer.copy_item(chapter_item, previous_epub)
+                else:
+                    writer.add_item(chapter_item)
+                spine.append(chapter_item)
+                volume_contents.append(chapter_item)
+
+            volume_section = epub.Section(volume_title, href=volume_item.file_name)
+            toc.append([volume_section, volume_contents])
+
+        book.toc = toc
+        book.spine = spine
+        writer.add_item(epub.EpubNcx())
+        writer.add_item(epub.EpubNav())
+
+        logger.debug("Adding images")
+        for image_path in images:
+            filename = os.path.basename(image_path)
             image_item = epub.EpubImage(
                 file_name=f"images/{filename}",
-                media_type="image/jpeg",
-                content=fp.read(),
+                media_type=IMAGE_MEDIA_TYPES.get(
+                    os.path.splitext(filename)[1], "image/jpeg"
+                ),
+                content=b"",
             )
-        book.add_item(image_item)
+            if (
+                manifest
+                and manifest.is_unchanged(image_item.file_name, file_digest(image_path))
+                and writer.can_copy(image_item.file_name, previous_epub)
+            ):
+                writer.copy_item(image_item, previous_epub)
+            else:
+                writer.add_item(image_item, source_file=image_path)
 
-    logger.debug("Saving epub file")
-    file_name = good_file_name
-    if not no_suffix_after_filename:
-        file_name += " " + suffix
-
-    epub_path = os.path.join(output_path, "epub")
-    file_path = os.path.join(epub_path, file_name + ".epub")
+        logger.debug("Saving epub file")
 
-    logger.info("Writing %s", file_path)
-    os.makedirs(epub_path, exist_ok=True)
-    epub.write_epub(file_path, book, {})
+    if manifest:
+        manifest.save(file_path)
 
     print("Created: %s.epub" % file_name)
     return file_path
@@ -164,6 +250,16 @@ def make_epubs(app, data: Dict[str, List[Chapter]]) -> List[str]:
     from ..core.app import App
 
     assert isinstance(app, App)
+    assert app.store is not None
+
+    image_path = os.path.join(app.output_path, "images")
+    available_images = set()
+    if os.path.isdir(image_path):
+        available_images = {
+            filename
+            for filename in os.listdir(image_path)
+            if os.path.splitext(filename)[1] in IMAGE_MEDIA_TYPES
+        }
 
     epub_files = []
     for volume, chapters in data.items():
@@ -176,18 +272,16 @@ def make_epubs(app, data: Dict[str, List[Chapter]]) -> List[str]:
             suffix = chapter.volume or 1
             volumes.setdefault(suffix, []).append(chapter)
 
-        images = []
-        image_path = os.path.join(app.output_path, "images")
-        if os.path.isdir(image_path):
-            images = {
-                os.path.join(image_path, filename)
-                for filename in os.listdir(image_path)
-                if filename.endswith(".jpg")
-            }
+        # Only the images used by the chapters of this book
+        images: Dict[str, None] = {}
+        for chapter in chapters:
+            for filename in chapter.get("images") or {}:
+                if filename in available_images:
+                    images[os.path.join(image_path, filename)] = None
 
         output = bind_epub_book(
             chapter_groups=list(volumes.values()),
-            images=images,
+            images=list(images),
             suffix=volume,
             book_title=book_title,
             novel_title=app.crawler.novel_title,
@@ -197,6 +291,8 @@ def make_epubs(app, data: Dict[str, List[Chapter]]) -> List[str]:
             book_cover=app.book_cover,
             good_file_name=app.good_file_name,
             no_suffix_after_filename=app.no_suffix_after_filename,
+            iter_bodies=app.store.iter_bodies,
+            manifest=BindManifest(app, f"epub/{book_key(app, chapters)}"),
         )
         epub_files.append(output)
     return epub_files
@@ -0,0 +1,199 @@
+"""
+To write epub files without keeping the whole book in memory
+"""
+import copy
+import logging
+import os
+import shutil
+import struct
+import zipfile
+from typing import Optional, Set
+
+from ..utils.archive import can_write_raw_entry, open_zip_writer, write_raw_entry
+
+try:
+    from ebooklib import epub
+except ImportError:
+    logging.fatal("Failed to import ebooklib")
+
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_SIZE = 1024 * 1024
+RELEASED_CONTENT = "<p></p>"
+
+# Positions of the name and extra field lengths in a local file header
+_FH_FILENAME_LENGTH = 10
+_FH_EXTRA_FIELD_LENGTH = 11
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+
+def copy_zip_entry(source: zipfile.ZipFile, name: str, target: zipfile.ZipFile):
+    """
+    Copies the compressed data of an entry to another zip file as it is,
+    without decompressing and compressing it again.
+    """
+    info = source.getinfo(name)
+    assert source.fp and target.fp
+
+    if not can_write_raw_entry(target):
+        # compressed again by zipfile
+        target.writestr(name, source.read(name), info.compress_type)
+        return
+
+    source.fp.seek(info.header_offset)
+    header = struct.unpack(
+        zipfile.structFileHeader,
+        source.fp.read(zipfile.sizeFileHeader),
+    )
+    source.fp.seek(
+        header[_FH_FILENAME_LENGTH] + header[_FH_EXTRA_FIELD_LENGTH],
+        os.SEEK_CUR,
+    )
+
+    zinfo = copy.copy(info)
+    zinfo.extra = b""
+    zinfo.flag_bits &= ~_DATA_DESCRIPTOR_FLAG  # sizes are known beforehand
+    if hasattr(zinfo, "_end_offset"):
+        zinfo._end_offset = None
+
+    def _chunks():
+        remaining = info.compress_size
+        while remaining > 0:
+            chunk = source.fp.read(min(remaining, COPY_CHUNK_SIZE))
+            if not chunk:
+                raise zipfile.BadZipFile(f"Truncated entry: {name}")
+            remaining -= len(chunk)
+            yield chunk
+
+    write_raw_entry(target, zinfo, _chunks())
+
+
+class EpubStreamWriter(epub.EpubWriter):
+    """
+    Writes the items of an `epub.EpubBook` to the file as soon as they are
+    added, and drops their contents afterwards. The OPF, NCX and Nav are
+    generated by ebooklib at the end, so they are the same as the ones
+    `epub.write_epub` would produce for the same book.
+
+    Usage:
+        with EpubStreamWriter(file_name, book) as writer:
+            writer.add_item(item)
+            writer.add_item(image, source_file=image_path)
+            if writer.can_copy(page.file_name, previous_epub):
+                writer.copy_item(page, previous_epub)
+    """
+
+    def __init__(self, name: str, book: epub.EpubBook, options=None) -> None:
+        super().__init__(name, book, options)
+        self.out: Optional[zipfile.ZipFile] = None
+        self.written: Set[int] = set()
+
+    def __enter__(self) -> "EpubStreamWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # Do not leave a broken file behind
+        if self.out:
+            self.out.close()
+        if os.path.isfile(self.file_name):
+            os.remove(self.file_name)
+
+    def open(self) -> None:
+        self.process()
+        self.out = open_zip_writer(
+            self.file_name,
+            self.options.get("compresslevel", 6),
+        )
+        self.out.writestr(
+            "mimetype",
+            "application/epub+zip",
+            compress_type=zipfile.ZIP_STORED,
+        )
+        self._write_container()
+
+    def add_item(self, item: epub.EpubItem, source_file: Optional[str] = None):
+        """Adds an item to the book and writes it to the file"""
+        self.book.add_item(item)
+        self.write_item(item, source_file)
+        return item
+
+    def write_item(self, item: epub.EpubItem, source_file: Optional[str] = None):
+        """
+        Writes an item that is already in the book. If `source_file` is given,
+        it is copied in chunks as the content of the item.
+        """
+        assert self.out, "Writer is not open"
+        if id(item) in self.written:
+            return
+        if isinstance(item, (epub.EpubNcx, epub.EpubNav)):
+            return  # these depend on the rest of the book
+
+        self.written.add(id(item))
+        entry_name = self._entry_name(item)
+
+        if source_file:
+            with open(source_file, "rb") as src, self.out.open(entry_name, "w") as dst:
+                shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+            return
+
+        # ebooklib renders the items after the manifest is written, so any
+        # property added while rendering does not appear in the manifest.
+        properties = list(getattr(item, "properties", []))
+        can_release = isinstance(item, epub.EpubHtml) and not self._has_pages(item)
+
+        self.out.writestr(entry_name, item.get_content())
+
+        if hasattr(item, "properties"):
+            item.properties = properties
+        if can_release:
+            item.content = RELEASED_CONTENT
+
+    def can_copy(self, file_name: str, source: Optional[zipfile.ZipFile]) -> bool:
+        """Checks if the item can be copied from the given epub file"""
+        entry_name = f"{self.book.FOLDER_NAME}/{file_name}"
+        return bool(source) and entry_name in source.NameToInfo
+
+    def copy_item(self, item: epub.EpubItem, source: zipfile.ZipFile):
+        """
+        Adds an item to the book and copies its content as it is from the
+        same entry of another epub file, e.g. the previous bind of this book.
+        """
+        assert self.out, "Writer is not open"
+        self.book.add_item(item)
+        self.written.add(id(item))
+        copy_zip_entry(source, self._entry_name(item), self.out)
+        if isinstance(item, epub.EpubHtml):
+            item.content = RELEASED_CONTENT
+        return item
+
+    def close(self) -> None:
+        assert self.out, "Writer is not open"
+        for item in self.book.get_items():
+            self.write_item(item)
+
+        self._write_opf()
+        for item in self.book.get_items():
+            if isinstance(item, epub.EpubNcx):
+                self.out.writestr(self._entry_name(item), self._get_ncx())
+            elif isinstance(item, epub.EpubNav):
+                self.out.writestr(self._entry_name(item), self._get_nav(item))
+
+        self.out.close()
+        self.out = None
+
+    def _entry_name(self, item: epub.EpubItem) -> str:
+        if item.manifest:
+            return f"{self.book.FOLDER_NAME}/{item.file_name}"
+        return item.file_name
+
+    def _has_pages(self, item: epub.EpubHtml) -> bool:
+        # The page-list in Nav is collected from the contents of documents
+        content = item.content
+        if isinstance(content, bytes):
+            return b"epub:type" in content
+        return "epub:type" in str(content)
@@ -0,0 +1,98 @@
+"""
+To reuse the artifacts of the previous bind that did not change
+"""
+import hashlib
+import os
+import shutil
+from typing import Dict, List, Optional
+
+
+def content_digest(*parts) -> str:
+    md5 = hashlib.md5()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode("utf-8")
+        md5.update(part)
+        md5.update(b"\0")
+    return md5.hexdigest()
+
+
+def file_digest(file_name: str) -> str:
+    """A cheap digest of a file that changes when the file is replaced"""
+    stat = os.stat(file_name)
+    return content_digest(stat.st_size, stat.st_mtime_ns)
+
+
+def book_key(app, chapters: List[dict]) -> str:
+    """
+    Names a book by what does not change when new chapters are added: the
+    volume when packed by volumes, or the first chapter otherwise.
+    """
+    if app.pack_by_volume:
+        return "volume-%s" % (chapters[0].get("volume") or 1)
+    return "from-%s" % chapters[0]["id"]
+
+
+class BindManifest:
+    """
+    Keeps the digests of the contents used to generate each artifact of a
+    book, and compares them with the ones saved in the previous bind. The
+    name should be stable for the book, see `book_key`, because the output
+    file is renamed when the chapters change.
+    """
+
+    def __init__(self, app, name: str) -> None:
+        from ..core.app import App
+
+        assert isinstance(app, App)
+        assert app.store is not None
+
+        self.name = name
+        self.store = app.store
+        self.output_path = app.output_path
+        saved = self.store.load_manifest(name)
+        self.previous: Dict[str, str] = saved.get("digests") or {}
+        self.previous_output: Optional[str] = None
+        if saved.get("output"):
+            self.previous_output = os.path.join(self.output_path, saved["output"])
+        self.current: Dict[str, str] = {}
+
+    def is_unchanged(self, key: str, digest: str) -> bool:
+        """Records the digest of an artifact and checks if it has changed"""
+        self.current[key] = digest
+        return self.previous.get(key) == digest
+
+    def reuse_previous_output(self, output: str) -> None:
+        """Renames the output of the previous bind, if it had another name"""
+        previous = self.previous_output
+        if not previous or os.path.abspath(previous) == os.path.abspath(output):
+            return
+        if os.path.exists(previous) and not os.path.exists(output):
+            os.replace(previous, output)
+
+    def save(self, output: str) -> None:
+        """
+        Call it after the artifacts are written successfully to the `output`
+        file or folder. The output of the previous bind is removed if it had
+        another name, and so are the files of the removed artifacts.
+        """
+        previous = self.previous_output
+        if previous and os.path.abspath(previous) != os.path.abspath(output):
+            if os.path.isdir(previous):
+                shutil.rmtree(previous, ignore_errors=True)
+            elif os.path.isfile(previous):
+                os.remove(previous)
+        if os.path.isdir(output):
+            for key in set(self.previous) - set(self.current):
+                file_name = os.path.join(output, key)
+                if os.path.isfile(file_name):
+                    os.remove(file_name)
+
+        saved = {
+            "output": os.path.relpath(output, self.output_path),
+            "digests": self.current,
+        }
+        self.store.save_manifest(self.name, saved)
+        self.previous = self.current
+        self.previous_output = output
+        self.current = {}
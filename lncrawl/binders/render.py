@@ -0,0 +1,95 @@
+"""
+To render chapter pages in parallel while binding
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import Lock
+from typing import Callable, Deque, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from minify_html import minify
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+RENDER_AHEAD_PER_WORKER = 8
+MIN_PAGES_TO_PARALLELIZE = 64
+
+__executor: Optional[ProcessPoolExecutor] = None
+__executor_lock = Lock()
+
+
+def minify_page(html: str) -> str:
+    return minify(html, minify_css=True, minify_js=True)
+
+
+def __get_executor() -> ProcessPoolExecutor:
+    global __executor
+    with __executor_lock:
+        if __executor is None:
+            # spawn does not copy the locks held by the other threads of the app
+            __executor = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(__executor.shutdown, False)
+        return __executor
+
+
+def minify_in_order(
+    pages: Iterable[Tuple[T, str]],
+    total: Optional[int] = None,
+) -> Iterator[Tuple[T, str]]:
+    """
+    Minifies the html of every (key, html) pair in a pool of processes and
+    yields them in the same order. See `render_in_order`.
+    """
+    return render_in_order(minify_page, pages, total)
+
+
+def render_in_order(
+    render: Callable[[str], R],
+    pages: Iterable[Tuple[T, str]],
+    total: Optional[int] = None,
+) -> Iterator[Tuple[T, R]]:
+    """
+    Calls `render` with the html of every (key, html) pair in a pool of
+    processes and yields the results in the same order. Only a few pages per
+    worker are rendered ahead of the consumer, so the memory stays bounded.
+    The `render` must be a module level function, so that it can be pickled.
+
+    Small books, and machines with a single cpu, are rendered inline.
+    """
+    if RENDER_WORKERS <= 1 or (total is not None and total < MIN_PAGES_TO_PARALLELIZE):
+        for key, html in pages:
+            yield key, render(html)
+        return
+
+    try:
+        executor = __get_executor()
+    except Exception as e:
+        logger.warning("Rendering pages without workers. Error: %s", e)
+        for key, html in pages:
+            yield key, render(html)
+        return
+
+    window = RENDER_WORKERS * RENDER_AHEAD_PER_WORKER
+    pending: Deque[Tuple[T, Future]] = deque()
+    try:
+        for key, html in pages:
+            pending.append((key, executor.submit(render, html)))
+            if len(pending) >= window:
+                key, future = pending.popleft()
+                yield key, future.result()
+        while pending:
+            key, future = pending.popleft()
+            yield key, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
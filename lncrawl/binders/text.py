@@ -1,29 +1,126 @@
 import logging
 import os
 import re
-
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
 
 from ..assets.chars import Chars
+from .manifest import BindManifest, book_key, content_digest
+from .render import render_in_order
 
 logger = logging.getLogger(__name__)
 
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# The contents of these tags are not text, e.g. <script> and <style>
+SKIPPED_TAGS = {"script", "style", "template"}
+
+
+class TextExtractor(HTMLParser):
+    """Collects the stripped strings of a html, like `soup.stripped_strings`"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.strings = []
+        self.skipped = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skipped += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self.skipped:
+            self.skipped -= 1
+
+    def handle_data(self, data):
+        if self.skipped:
+            return
+        data = data.strip()
+        if data:
+            self.strings.append(data)
+
+    def unknown_decl(self, data):
+        # The CDATA sections are kept as text, like `soup.stripped_strings`.
+        # The other declarations, e.g. conditional comments, are not.
+        if data.upper().startswith("CDATA["):
+            self.handle_data(data[len("CDATA[") :])
+
+
+def html_to_text(html: str) -> str:
+    parser = TextExtractor()
+    parser.feed(html)
+    parser.close()
+    text = "\n\n".join(parser.strings)
+    return re.sub(r"[\r\n]+", Chars.EOL + Chars.EOL, text)
+
+
+def use_text_per_volume() -> bool:
+    """Whether to write one text file per volume instead of per chapter"""
+    from ..core.arguments import get_args
+
+    return bool(getattr(get_args(), "text_per_volume", False))
+
 
 def make_texts(app, data):
+    from ..core.app import App
+
+    assert isinstance(app, App)
+    assert app.store is not None
+
+    if use_text_per_volume():
+        return make_volume_texts(app, data)
+
     text_files = []
     for vol in data:
+        if not data[vol]:
+            continue
         dir_name = os.path.join(app.output_path, "text", vol)
+        manifest = BindManifest(app, f"text/{book_key(app, data[vol])}")
+        manifest.reuse_previous_output(dir_name)
         os.makedirs(dir_name, exist_ok=True)
-        for chap in data[vol]:
-            file_name = "%s.txt" % str(chap["id"]).rjust(5, "0")
-            file_name = os.path.join(dir_name, file_name)
-            with open(file_name, "w", encoding="utf8") as file:
-                body = chap["body"].replace("</p><p", "</p>\n<p")
-                soup = BeautifulSoup(body, "lxml")
-                text = "\n\n".join(soup.stripped_strings)
-                text = re.sub(r"[\r\n]+", Chars.EOL + Chars.EOL, text)
+
+        def _pages(chapters=data[vol], manifest=manifest, dir_name=dir_name):
+            for chap, body in app.store.iter_bodies(chapters):
+                file_name = "%s.txt" % str(chap["id"]).rjust(5, "0")
+                unchanged = manifest.is_unchanged(file_name, content_digest(body))
+                file_name = os.path.join(dir_name, file_name)
+                if unchanged and os.path.isfile(file_name):
+                    yield (file_name, False), ""  # kept from the last bind
+                else:
+                    yield (file_name, True), body
+
+        texts = render_in_order(html_to_text, _pages(), len(data[vol]))
+        for (file_name, changed), text in texts:
+            if changed:
+                with open(file_name, "w", encoding="utf8") as file:
+                    file.write(text)
+            text_files.append(file_name)
+        manifest.save(dir_name)
+
+    print("Created: %d text files" % len(text_files))
+    return text_files
+
+
+def make_volume_texts(app, data):
+    """Writes the chapters of every volume into a single text file"""
+    text_path = os.path.join(app.output_path, "text")
+    os.makedirs(text_path, exist_ok=True)
+
+    text_files = []
+    for vol in data:
+        if not data[vol]:
+            continue
+        file_name = os.path.join(text_path, "%s.txt" % vol)
+        # only to remove the file of the previous bind, if it was renamed
+        manifest = BindManifest(app, f"text-volume/{book_key(app, data[vol])}")
+        bodies = app.store.iter_bodies(data[vol])
+        texts = render_in_order(html_to_text, bodies, len(data[vol]))
+        with open(file_name, "w", encoding="utf8", buffering=WRITE_BUFFER_SIZE) as file:
+            for index, (_, text) in enumerate(texts):
+                if index:
+                    file.write(Chars.EOL * 3)
                 file.write(text)
-                text_files.append(file_name)
+        manifest.save(file_name)
+        text_files.append(file_name)
 
     print("Created: %d text files" % len(text_files))
     return text_files
@@ -1,13 +1,20 @@
+import json
 import logging
 import os
-import shutil
-
-from minify_html import minify
+from html import escape as html_escape
 
 from ..assets.web import get_css_style, get_js_script
+from ..utils.files import link_file
+from .manifest import BindManifest, book_key, content_digest
+from .render import minify_in_order, minify_page
 
 logger = logging.getLogger(__name__)
 
+STYLE_FILE_NAME = "style.css"
+SCRIPT_FILE_NAME = "script.js"
+TOC_FILE_NAME = "toc.js"
+IMAGES_DIR_NAME = "images"
+
 
 def get_filename(chapter):
     if not chapter or "id" not in chapter:
@@ -15,7 +22,24 @@ def get_filename(chapter):
     return str(chapter["id"]).rjust(5, "0") + ".html"
 
 
-def bind_html_chapter(chapters, index, direction="ltr"):
+def use_shared_images() -> bool:
+    """Whether the volumes should refer to one images folder"""
+    from ..core.arguments import get_args
+
+    return bool(getattr(get_args(), "web_shared_images", False))
+
+
+def bind_html_chapter(chapters, index, direction="ltr", body=None, images_url=None):
+    html, file_name = build_html_chapter(chapters, index, direction, body, images_url)
+    return minify_page(html), file_name
+
+
+def build_html_chapter(chapters, index, direction="ltr", body=None, images_url=None):
+    """
+    Same as `bind_html_chapter`, but the html is not minified. The page only
+    links to the neighbouring chapters. The style, script and the table of
+    contents are shared by the pages, see `write_web_assets`.
+    """
     chapter = chapters[index]
     prev_chapter = chapters[index - 1] if index > 0 else None
     next_chapter = chapters[index + 1] if index + 1 < len(chapters) else None
@@ -24,24 +48,23 @@ def bind_html_chapter(chapters, index, direction="ltr"):
     prev_filename = get_filename(prev_chapter)
     next_filename = get_filename(next_chapter)
 
-    chapter_options = []
-    for idx, item in enumerate(chapters):
-        title = item["title"]
-        value = get_filename(item)
-        selected = " selected" if idx == index else ""
-        chapter_options.append(f'<option value="{value}"{selected}>{title}</option>')
+    # The other options are loaded from the TOC_FILE_NAME when needed
+    title = html_escape(str(chapter["title"]))
+    chapter_options = f'<option value="{this_filename}" selected>{title}</option>'
 
     button_group = f"""
     <div class="link-group">
         <a class="btn prev-button" href="{prev_filename or '#'}">Previous</a>
-        <select class="toc">{''.join(chapter_options)}</select>
+        <select class="toc">{chapter_options}</select>
         <a class="btn next-button"  href="{next_filename or '#'}">Next</a>
     </div>
     """
 
-    main_body = chapter["body"]
+    main_body = chapter["body"] if body is None else body
     if not main_body:
         main_body = f"<h1>{chapter['title']}</h1><p>No contents</p>"
+    elif images_url:
+        main_body = main_body.replace(f'src="{IMAGES_DIR_NAME}/', f'src="{images_url}/')
 
     html = f"""
     <!DOCTYPE html>
@@ -50,12 +73,8 @@ def bind_html_chapter(chapters, index, direction="ltr"):
             <meta charset="utf-8"/>
             <meta name="viewport" content="width=device-width, initial-scale=1"/>
             <title>{chapter['title']}</title>
-            <style>
-                {get_css_style()}
-            </style>
-            <script type="text/javascript">
-                {get_js_script()}
-            </script>
+            <link rel="stylesheet" href="{STYLE_FILE_NAME}"/>
+            <script type="text/javascript" src="{SCRIPT_FILE_NAME}" defer></script>
         </head>
         <body>
             <div id="content">
@@ -68,40 +87,105 @@ def bind_html_chapter(chapters, index, direction="ltr"):
     </html>
     """
 
-    html = minify(html, minify_css=True, minify_js=True)
     return html, this_filename
 
 
+def page_digest(chapters, index, direction="ltr", body=None, images_url=None):
+    """The digest of what a page is built from, see `build_html_chapter`"""
+    chapter = chapters[index]
+    prev_chapter = chapters[index - 1] if index > 0 else None
+    next_chapter = chapters[index + 1] if index + 1 < len(chapters) else None
+    return content_digest(
+        chapter["title"],
+        chapter["body"] if body is None else body,
+        get_filename(prev_chapter),
+        get_filename(next_chapter),
+        direction,
+        images_url,
+    )
+
+
+def write_web_assets(dir_name, chapters):
+    """Writes the files shared by all pages of a volume"""
+    with open(os.path.join(dir_name, STYLE_FILE_NAME), "w", encoding="utf8") as f:
+        f.write(get_css_style())
+    with open(os.path.join(dir_name, SCRIPT_FILE_NAME), "w", encoding="utf8") as f:
+        f.write(get_js_script())
+
+    # A script instead of json, because browsers block fetch on file:// urls
+    toc = [[get_filename(chapter), chapter["title"]] for chapter in chapters]
+    toc_json = json.dumps(toc, ensure_ascii=False).replace("</", "<\\/")
+    with open(os.path.join(dir_name, TOC_FILE_NAME), "w", encoding="utf8") as f:
+        f.write(f"window.LNCRAWL_TOC = {toc_json};\n")
+
+
 def make_webs(app, data):
     assert isinstance(data, dict)
     from ..core.app import App
 
     assert isinstance(app, App)
+    assert app.store is not None
+
+    # The images are linked from the images downloaded for the novel. With
+    # shared images, the pages of every volume refer to `web/images` folder.
+    source_dir = os.path.join(app.output_path, IMAGES_DIR_NAME)
+    shared_images = use_shared_images()
+    images_url = f"../{IMAGES_DIR_NAME}" if shared_images else None
+    linked_images = set()
 
     web_files = []
     for vol, chapters in data.items():
         assert isinstance(vol, str) and vol in data, "Invalid volume name"
+        if not chapters:
+            continue
         dir_name = os.path.join(app.output_path, "web", vol)
-        img_dir = os.path.join(dir_name, "images")
+        manifest = BindManifest(app, f"web/{book_key(app, chapters)}")
+        manifest.reuse_previous_output(dir_name)
+        if shared_images:
+            img_dir = os.path.join(app.output_path, "web", IMAGES_DIR_NAME)
+        else:
+            img_dir = os.path.join(dir_name, IMAGES_DIR_NAME)
         os.makedirs(dir_name, exist_ok=True)
         os.makedirs(img_dir, exist_ok=True)
-        for index, chapter in enumerate(chapters):
+        direction = "rtl" if app.crawler.is_rtl else "ltr"
+        write_web_assets(dir_name, chapters)
+
+        def _pages(chapters=chapters, manifest=manifest, dir_name=dir_name):
+            bodies = app.store.iter_bodies(chapters)
+            for index, (chapter, body) in enumerate(bodies):
+                file_name = get_filename(chapter)
+                digest = page_digest(chapters, index, direction, body, images_url)
+                unchanged = manifest.is_unchanged(file_name, digest)
+                if unchanged and os.path.isfile(os.path.join(dir_name, file_name)):
+                    yield (chapter, file_name, False), ""  # kept from the last bind
+                    continue
+                html, _ = build_html_chapter(
+                    chapters, index, direction, body, images_url
+                )
+                yield (chapter, file_name, True), html
+
+        pages = minify_in_order(_pages(), len(chapters))
+        for (chapter, file_name, changed), html in pages:
             assert isinstance(chapter, dict)
 
             # Generate HTML file
-            direction = "rtl" if app.crawler.is_rtl else "ltr"
-            html, file_name = bind_html_chapter(chapters, index, direction)
             file_name = os.path.join(dir_name, file_name)
-            with open(file_name, "w", encoding="utf8") as file:
-                file.write(html)
+            if changed:
+                with open(file_name, "w", encoding="utf8") as file:
+                    file.write(html)
 
-            # Copy images
+            # Link images
             for filename in chapter.get("images", {}):
-                src_file = os.path.join(app.output_path, "images", filename)
                 dst_file = os.path.join(img_dir, filename)
-                shutil.copyfile(src_file, dst_file)
+                if dst_file in linked_images:
+                    continue
+                src_file = os.path.join(source_dir, filename)
+                if os.path.isfile(src_file):
+                    link_file(src_file, dst_file)
+                linked_images.add(dst_file)
 
             web_files.append(file_name)
+        manifest.save(dir_name)
 
     logger.info("Created: %d web files" % len(web_files))
     return web_files
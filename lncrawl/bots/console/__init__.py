@@ -10,12 +10,14 @@ class ConsoleBot:
     def __init__(self) -> None:
         self.app: Optional[App] = None
         self.search_mode = False
+        self.best_match: Optional[str] = None
 
     from .get_crawler import (
         choose_a_novel,
         confirm_retry,
         get_crawlers_to_search,
         get_novel_url,
+        show_search_update,
     )
     from .integration import process_chapter_range, start
     from .login_info import get_login_info
@@ -71,6 +71,14 @@ def get_crawlers_to_search(self) -> List[str]:
     return selected if len(selected) > 0 else links
 
 
+def show_search_update(self, results):
+    """Shows the best match whenever it changes during the search"""
+    if not results or results[0].title == self.best_match:
+        return
+    self.best_match = results[0].title
+    display.search_progress(results)
+
+
 def choose_a_novel(self):
     """Choose a single novel url from the search result"""
     args = get_args()
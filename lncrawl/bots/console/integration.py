@@ -57,7 +57,7 @@ def start(self):
     # Search for novels
     if self.search_mode:
         self.app.crawler_links = self.get_crawlers_to_search()
-        self.app.search_novel()
+        self.app.search_novel(on_update=self.show_search_update)
 
     def _download_novel():
         assert isinstance(self.app, App)
@@ -70,7 +70,8 @@ def start(self):
         if self.app.can_do("login"):
             self.app.login_data = self.get_login_info()
 
-        self.app.get_novel_info()
+        # Chapters can be downloaded along with the TOC if all are selected
+        self.app.get_novel_info(prefetch=bool(args.all))
 
         self.app.output_path = self.get_output_path()
         self.app.chapters = self.process_chapter_range()
@@ -1,9 +1,7 @@
-import json
 import logging
 from pathlib import Path
 from typing import List
 
-from box import Box
 from questionary import prompt
 
 from ... import constants as C
@@ -12,6 +10,7 @@ from ...core.app import App
 from ...core.arguments import get_args
 from ...core.crawler import Crawler
 from ...core.exeptions import LNException
+from ...core.novel_info import load_metadata
 from ...core.sources import prepare_crawler
 from ...models import MetaInfo
 from .open_folder_prompt import display_open_folder
@@ -26,9 +25,7 @@ def resume_session():
     resumable_meta_data: List[MetaInfo] = []
     for meta_file in Path(output_path).glob("**/" + C.META_FILE_NAME):
         try:
-            with open(meta_file, "r", encoding="utf-8") as fp:
-                data = json.load(fp)
-                meta: MetaInfo = Box(**data)
+            meta = load_metadata(str(meta_file))
             if meta.novel and meta.session and not meta.session.completed:
                 resumable_meta_data.append(meta)
         except Exception as e:
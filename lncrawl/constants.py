@@ -2,3 +2,4 @@ import os
 
 DEFAULT_OUTPUT_PATH = os.path.abspath("Lightnovels")
 META_FILE_NAME = "meta.json"
+META_JOURNAL_FILE_NAME = "meta.journal"
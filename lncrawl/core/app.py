@@ -2,8 +2,9 @@ import atexit
 import logging
 import os
 import shutil
-from threading import Thread
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Condition, Lock, Thread
+from typing import Dict, List, Optional, TextIO, Tuple
 from urllib.parse import urlparse
 
 from slugify import slugify
@@ -12,11 +13,22 @@ from .. import constants as C
 from ..binders import available_formats, generate_books
 from ..core.exeptions import LNException
 from ..core.sources import crawler_list, prepare_crawler
-from ..models import Chapter, CombinedSearchResult, OutputFormat
+from ..models import Chapter, CombinedSearchResult, ImageReport, OutputFormat
+from ..utils.archive import make_zip_archive
+from .arguments import get_args
 from .crawler import Crawler
-from .downloader import download_chapter_images, download_chapters
-from .novel_info import format_novel, save_metadata
+from .downloader import (
+    check_image_profile,
+    discard_prefetched,
+    download_chapter_images,
+    download_chapters,
+    download_file_image,
+    prefetch_chapters,
+    prefetch_cover,
+)
+from .novel_info import format_novel, format_title, save_metadata
 from .novel_search import search_novels
+from .store import ChapterStore
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +51,25 @@ class App:
         self.archived_outputs = None
         self.good_file_name: str = ""
         self.no_suffix_after_filename = False
+        self.prefetched_cover: Optional[Future] = None
+        self.cover_future: Optional[Future] = None
+        self.prefetch_futures: Dict[int, Future] = {}
+        self.prefetch_store: Optional[ChapterStore] = None
+        self.image_lock = Lock()
+        self.image_futures: Dict[str, Future] = {}
+        self.image_reports: Dict[str, ImageReport] = {}
+        self.image_chapters: Dict[str, List[Chapter]] = {}
+        # Chapters whose images are being downloaded, see `on_chapter_ready`
+        self.unready_chapters = 0
+        self.chapters_ready = Condition(self.image_lock)
+        self.pending_volumes: Dict[int, int] = {}
+        self.bound_volumes: Dict[str, Future] = {}
+        self.failed_chapters: Dict[int, List[str]] = {}
+        self.store: Optional[ChapterStore] = None
+        self.journal: Optional[TextIO] = None
+        # The chapter states in the metadata, to journal only the changes
+        self.chapter_states: Dict[int, dict] = {}
+        self.binder = ThreadPoolExecutor(1, thread_name_prefix="lncrawl_binder")
         atexit.register(self.destroy)
 
     def __background(self, target_method, *args, **kwargs):
@@ -56,6 +87,14 @@ class App:
         if self.crawler:
             self.crawler.destroy()
 
+        self.binder.shutdown(False)
+        discard_prefetched(self)
+        if self.store:
+            self.store.close()
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
         self.chapters.clear()
         logger.info("App destroyed")
 
@@ -78,12 +117,13 @@ class App:
                 if crawler.search_novel != Crawler.search_novel
             ]
 
-    def search_novel(self):
+    def search_novel(self, on_update=None):
         """Requires: user_input, crawler_links"""
         """Produces: search_results"""
+        """Calls `on_update` with the results found so far, as they arrive"""
         logger.info("Searching for novels in %d sites...", len(self.crawler_links))
 
-        search_novels(self)
+        search_novels(self, on_update)
 
         if not self.search_results:
             raise LNException("No results for: %s" % self.user_input)
@@ -103,9 +143,10 @@ class App:
             return True
         return getattr(self.crawler.__class__, prop_name) != getattr(Crawler, prop_name)
 
-    def get_novel_info(self):
+    def get_novel_info(self, prefetch: bool = False):
         """Requires: crawler, login_data"""
         """Produces: output_path"""
+        """Set `prefetch` to download chapters while the TOC is being read"""
         if not isinstance(self.crawler, Crawler):
             raise LNException("No crawler is selected")
 
@@ -115,7 +156,7 @@ class App:
 
         print("Retrieving novel info...")
         print(self.crawler.novel_url)
-        self.__background(self.crawler.read_novel_info)
+        self.__background(self.__read_novel_info, prefetch)
 
         format_novel(self.crawler)
         if not len(self.crawler.chapters):
@@ -130,19 +171,39 @@ class App:
         )
 
         if not self.good_file_name:
-            self.good_file_name = slugify(
-                self.crawler.novel_title,
-                max_length=50,
-                separator=" ",
-                lowercase=False,
-                word_boundary=True,
-            )
+            self.good_file_name = self.__novel_file_name()
+        self.output_path = self.default_output_path()
 
-        source_name = slugify(urlparse(self.crawler.home_url).netloc)
-        self.output_path = os.path.join(
-            C.DEFAULT_OUTPUT_PATH, source_name, self.good_file_name
+    def __novel_file_name(self) -> str:
+        assert self.crawler
+        return slugify(
+            format_title(self.crawler.novel_title),
+            max_length=50,
+            separator=" ",
+            lowercase=False,
+            word_boundary=True,
         )
 
+    def default_output_path(self) -> str:
+        """The output path of the novel, based on its title and source"""
+        assert self.crawler
+        source_name = slugify(urlparse(self.crawler.home_url).netloc)
+        file_name = self.good_file_name or self.__novel_file_name()
+        return os.path.join(C.DEFAULT_OUTPUT_PATH, source_name, file_name)
+
+    def __read_novel_info(self, prefetch: bool):
+        def _stream():
+            for chapter in self.crawler.stream_novel_info():
+                prefetch_cover(self)
+                yield chapter
+            prefetch_cover(self)
+
+        if prefetch:
+            prefetch_chapters(self, _stream())
+        else:
+            for _ in _stream():
+                pass
+
     # ----------------------------------------------------------------------- #
 
     def start_download(self):
@@ -152,20 +213,82 @@ class App:
 
         assert self.crawler
 
+        json_path = os.path.join(self.output_path, "json")
+        if not self.store:
+            self.store = ChapterStore(self.output_path)
+            if not len(self.store) and os.path.isdir(json_path):
+                count = self.store.import_json(json_path)
+                logger.info("Imported %d chapters from %s", count, json_path)
+
+        self.image_futures = {}
+        self.image_chapters = {}
+        self.image_reports = {}
+        self.unready_chapters = 0
+        self.bound_volumes = {}
+        self.pending_volumes = {}
+        if self.pack_by_volume:
+            for chapter in self.chapters:
+                volume = chapter["volume"]
+                self.pending_volumes[volume] = self.pending_volumes.get(volume, 0) + 1
+
+        check_image_profile(self)
+        self.cover_future = self.crawler.executor.submit(download_file_image, self)
+
         save_metadata(self)
         download_chapters(self)
-        save_metadata(self)
         download_chapter_images(self)
         save_metadata(self, True)
 
-        if not self.output_formats.get("json", False):
-            shutil.rmtree(os.path.join(self.output_path, "json"), ignore_errors=True)
+        self.store.flush()
+        shutil.rmtree(json_path, ignore_errors=True)
+        if self.output_formats.get("json", False):
+            self.store.export_json(json_path, self.pack_by_volume)
 
         if self.can_do("logout"):
             self.crawler.logout()
 
+    def on_chapter_ready(self, chapter: Chapter) -> None:
+        """Called when a chapter and all of its images are downloaded"""
+        with self.image_lock:
+            volume = chapter["volume"]
+            if volume not in self.pending_volumes:
+                return
+            self.pending_volumes[volume] -= 1
+            if self.pending_volumes[volume] > 0:
+                return
+            self.pending_volumes.pop(volume)
+
+        # Bind the volume while the rest are being downloaded
+        for vol in self.crawler.volumes:
+            if vol["id"] == volume:
+                suffix, chapters = self.__volume_data(vol)
+                future = self.binder.submit(self.__bind_volume, suffix, chapters)
+                with self.image_lock:
+                    self.bound_volumes[suffix] = future
+
+    def __bind_volume(self, suffix: str, chapters: List[Chapter]) -> dict:
+        logger.info("Binding %s while downloading the rest", suffix)
+        assert self.cover_future
+        self.cover_future.result()
+        return generate_books(self, {suffix: chapters}, track_progress=False)
+
     # ----------------------------------------------------------------------- #
 
+    def __volume_data(self, vol) -> Tuple[str, List[Chapter]]:
+        # filename_suffix = 'Volume %d' % vol['id']
+        filename_suffix = "Chapter %d-%d" % (
+            vol["start_chapter"],
+            vol["final_chapter"],
+        )
+        # The failed chapters are stored with their title, to show the gap
+        assert self.store
+        chapters = [
+            x
+            for x in self.chapters
+            if x["volume"] == vol["id"] and self.store.has(x["id"])
+        ]
+        return filename_suffix, chapters
+
     def bind_books(self):
         """Requires: crawler, chapters, output_path, pack_by_volume, book_cover, output_formats"""
         logger.info("Processing data for binding")
@@ -174,16 +297,8 @@ class App:
         data = {}
         if self.pack_by_volume:
             for vol in self.crawler.volumes:
-                # filename_suffix = 'Volume %d' % vol['id']
-                filename_suffix = "Chapter %d-%d" % (
-                    vol["start_chapter"],
-                    vol["final_chapter"],
-                )
-                data[filename_suffix] = [
-                    x
-                    for x in self.chapters
-                    if x["volume"] == vol["id"] and len(x["body"]) > 0
-                ]
+                filename_suffix, chapters = self.__volume_data(vol)
+                data[filename_suffix] = chapters
 
         else:
             first_id = self.chapters[0]["id"]
@@ -191,7 +306,23 @@ class App:
             vol = "c%s-%s" % (first_id, last_id)
             data[vol] = self.chapters
 
-        generate_books(self, data)
+        # Collect the volumes that were bound during download
+        outputs: Dict[str, list] = {}
+        with self.image_lock:
+            bound_volumes = list(self.bound_volumes.items())
+        for suffix, future in bound_volumes:
+            try:
+                for fmt, files in future.result().items():
+                    outputs.setdefault(fmt, []).extend(files or [])
+                data.pop(suffix, None)
+            except Exception:
+                logger.exception("Failed to bind %s during download", suffix)
+
+        if data:
+            for fmt, files in generate_books(self, data).items():
+                outputs.setdefault(fmt, []).extend(files or [])
+
+        return outputs
 
     # ----------------------------------------------------------------------- #
 
@@ -226,10 +357,10 @@ class App:
             else:
                 base_path = os.path.join(self.output_path, output_name)
                 logger.info("Compressing %s to %s" % (root_dir, base_path))
-                archived_file = shutil.make_archive(
+                archived_file = make_zip_archive(
                     base_path,
-                    format="zip",
                     root_dir=root_dir,
+                    level=getattr(get_args(), "archive_level", None),
                 )
                 print("Compressed:", os.path.basename(archived_file))
 
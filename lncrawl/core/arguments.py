@@ -254,6 +254,56 @@ _builder = Args(
             default=1,
             help="Discord bot shard counts (default: 1)",
         ),
+        Args(
+            "--bind-workers",
+            type=int,
+            default=0,
+            metavar="N",
+            help="Number of books to bind or convert at the same time. Default: auto.",
+        ),
+        Args(
+            "--image-profile",
+            choices=["original", "kindle", "kobo", "tablet", "phone"],
+            default="original",
+            help="Resize the images to fit the screen of a device. Default: original.",
+        ),
+        Args(
+            "--webp-images",
+            action="store_true",
+            help="Save the images in WebP format. Not every reader supports it.",
+        ),
+        Args(
+            "--image-cache-size",
+            type=int,
+            default=0,
+            metavar="MB",
+            help="Keep up to this many MB of images in ~/.lncrawl/images to share them between novels. Default: 0 (disabled).",
+        ),
+        Args(
+            "--search-cache-size",
+            type=int,
+            default=32,
+            metavar="MB",
+            help="Size of the cache of search results. 0 disables it. Default: 32 MB.",
+        ),
+        Args(
+            "--archive-level",
+            type=int,
+            choices=range(10),
+            default=6,
+            metavar="[0-9]",
+            help="Compression level of the archives. 0 stores the files. Default: 6.",
+        ),
+        Args(
+            "--text-per-volume",
+            action="store_true",
+            help="Write one text file per volume instead of one per chapter.",
+        ),
+        Args(
+            "--web-shared-images",
+            action="store_true",
+            help="Keep the images of all volumes in one folder for web format.",
+        ),
         Args(
             "--suppress",
             action="store_true",
@@ -1,6 +1,8 @@
 import logging
 from abc import abstractmethod
-from typing import List
+from typing import Generator, List, Optional
+
+from bs4 import Tag
 
 from ..models import Chapter, SearchResult, Volume
 from ..utils.cleaner import TextCleaner
@@ -15,6 +17,8 @@ class Crawler(Scraper):
     has_manga = False
     has_mtl = False
     base_url: List[str]
+    # Seconds for which the search results are fresh. None uses the default.
+    search_cache_ttl: Optional[float] = None
 
     # ------------------------------------------------------------------------- #
     # Constructor & Destructors
@@ -73,11 +77,28 @@ class Crawler(Scraper):
         """Get novel title, author, cover, volumes and chapters"""
         raise NotImplementedError()
 
+    def stream_novel_info(self) -> Generator[Chapter, None, None]:
+        """
+        Same as `read_novel_info`, but yields each chapter as soon as it is
+        discovered. The chapter ids and volumes are final only after the
+        generator is exhausted and the novel is formatted.
+        """
+        self.read_novel_info()
+        yield from self.chapters
+
     @abstractmethod
     def download_chapter_body(self, chapter: Chapter) -> str:
         """Download body of a single chapter and return as clean html format."""
         raise NotImplementedError()
 
+    def download_chapter_tag(self, chapter: Chapter) -> Optional[Tag]:
+        """
+        Download a single chapter and return the tag containing its text, as
+        it is. The cleaning and the other post-processing are done on the tag,
+        and it is serialized once. Returns None to use `download_chapter_body`.
+        """
+        return None
+
     def index_of_chapter(self, url: str) -> int:
         """Return the index of chapter by given url or 0"""
         url = self.absolute_url(url)
@@ -4,6 +4,7 @@ import traceback
 from typing import List
 
 from colorama import Fore, Style
+from tqdm import tqdm
 
 from ..assets.chars import Chars
 from ..assets.platforms import Platform
@@ -195,6 +196,22 @@ def __format_search_result_info(short_info):
     )
 
 
+def search_progress(results: List[CombinedSearchResult]):
+    # without breaking the progress bar of the search
+    best = results[0]
+    tqdm.write(
+        "%s%s Best match so far: %s [in %d sources] (%d novels found)%s"
+        % (
+            Fore.CYAN,
+            Chars.RIGHT_ARROW,
+            best.title,
+            len(best.novels),
+            len(results),
+            Fore.RESET,
+        )
+    )
+
+
 def format_novel_choices(choices: List[CombinedSearchResult]):
     items = []
     for index, item in enumerate(choices):
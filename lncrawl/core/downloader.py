@@ -1,34 +1,54 @@
 """
 To download chapter bodies
 """
+
 import base64
 import hashlib
-import json
+import importlib.util
 import logging
 import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import wait
+from contextlib import contextmanager
+from functools import partial
 from io import BytesIO
+from typing import Dict, Iterable, List, Tuple
 
+from bs4 import Tag
 from PIL import Image
 
-from ..core.exeptions import LNException
+from ..core.exeptions import AbortedException
+from ..models import Chapter
+from ..utils.files import link_file
 from ..utils.imgen import generate_cover_image
 from .arguments import get_args
+from .image_cache import get_image_cache
+from .image_pipeline import (
+    get_image_profile,
+    image_extension,
+    image_format_of,
+    log_image_reports,
+    prepare_image,
+    profile_key,
+)
+from .novel_info import journal_chapter, journal_event
+from .proxy import has_proxies
+from .store import ChapterStore, downloaded_chapter_ids
 
 logger = logging.getLogger(__name__)
 
+MAX_FAILURE_RATE = 0.75
+MAX_RETRY_ATTEMPTS = 4
+RETRY_TIMEOUT_SCALE = 3
+MAX_RETRY_TIMEOUT = 60  # seconds, unless the default timeout is longer
+BROWSER_MODULES = ["selenium", "undetected_chromedriver"]
+# The profile of the images saved in the output path, see `check_image_profile`
+IMAGE_PROFILE_FILE_NAME = "profile.txt"
 
-def get_chapter_filename(app, chapter):
-    from .app import App
-
-    assert isinstance(app, App)
-
-    dir_name = os.path.join(app.output_path, "json")
-    if app.pack_by_volume:
-        vol_name = "Volume " + str(chapter["volume"]).rjust(2, "0")
-        dir_name = os.path.join(dir_name, vol_name)
-
-    chapter_name = str(chapter["id"]).rjust(5, "0")
-    return os.path.join(dir_name, chapter_name + ".json")
+IMG_TAG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+IMG_ALT_RE = re.compile(r'\balt="([^"]*)"')
 
 
 def extract_chapter_images(app, chapter):
@@ -41,9 +61,21 @@ def extract_chapter_images(app, chapter):
     if not chapter["body"]:
         return
 
-    chapter.setdefault("images", {})
     soup = app.crawler.make_soup(chapter["body"])
-    for img in soup.select("img"):
+    rewrite_chapter_images(app, chapter, soup)
+
+    soup_body = soup.select_one("body")
+    assert soup_body
+    chapter["body"] = "".join([str(x) for x in soup_body.contents])
+
+
+def rewrite_chapter_images(app, chapter, tag: Tag):
+    """Points the images in the tag to the files they will be downloaded to"""
+    assert app.crawler is not None
+
+    chapter.setdefault("images", {})
+    extension = image_extension(get_image_profile())
+    for img in tag.select("img"):
         if not img or not img.has_attr("src"):
             continue
 
@@ -51,21 +83,30 @@ def extract_chapter_images(app, chapter):
         if not full_url.startswith("http"):
             continue
 
-        filename = hashlib.md5(full_url.encode()).hexdigest() + ".jpg"
+        filename = hashlib.md5(full_url.encode()).hexdigest() + extension
         img.attrs = {"src": "images/" + filename, "alt": filename}
         chapter["images"][filename] = full_url
 
-    soup_body = soup.select_one("body")
-    assert soup_body
-    chapter["body"] = "".join([str(x) for x in soup_body.contents])
+
+def process_chapter_tag(app, chapter, tag: Tag) -> str:
+    """
+    Cleans the downloaded tag of a chapter and rewrites its images in the
+    same tree, and serializes it only once.
+    """
+    assert app.crawler is not None
+
+    cleaner = app.crawler.cleaner
+    cleaner.clean_contents(tag)
+    # after cleaning, which removes the alt attributes
+    rewrite_chapter_images(app, chapter, tag)
+    return cleaner.join_paragraphs(tag)
 
 
 def save_chapter_body(app, chapter):
     from .app import App
 
     assert isinstance(app, App)
-
-    file_name = get_chapter_filename(app, chapter)
+    assert app.store is not None
 
     title = chapter["title"]
     title = "&lt;".join(title.split("<"))
@@ -80,9 +121,25 @@ def save_chapter_body(app, chapter):
             chapter["url"],
         )
 
-    os.makedirs(os.path.dirname(file_name), exist_ok=True)
-    with open(file_name, "w", encoding="utf-8") as file:
-        file.write(json.dumps(chapter, ensure_ascii=False))
+    app.store.put(chapter)
+    journal_chapter(app, chapter)
+
+
+def fetch_chapter_body(app, chapter):
+    from .app import App
+
+    assert isinstance(app, App)
+    assert app.crawler is not None
+    assert isinstance(chapter, dict), "Invalid chapter"
+
+    logger.debug("Downloading chapter %d: %s", chapter["id"], chapter["url"])
+    tag = app.crawler.download_chapter_tag(chapter)
+    if tag is not None:
+        chapter["body"] = process_chapter_tag(app, chapter, tag)
+    else:
+        chapter["body"] = app.crawler.download_chapter_body(chapter)
+        extract_chapter_images(app, chapter)
+    chapter["success"] = True
 
 
 def download_chapter_body(app, chapter):
@@ -91,30 +148,128 @@ def download_chapter_body(app, chapter):
 
     assert isinstance(app, App)
     assert app.crawler is not None
+    assert app.store is not None
+
+    prefetch = app.prefetch_futures.pop(chapter["id"], None)
+
+    # Downloaded in a previous run. The body is not read from the store.
+    if chapter["id"] in app.store:
+        if prefetch:
+            prefetch.cancel()
+        logger.debug("Restoring chapter %d", chapter["id"])
+        chapter["images"] = app.store.get_images(chapter["id"])
+        chapter["body"] = None
+        chapter["success"] = True
+        app.progress += 1
+        queue_chapter_images(app, chapter)
+        return
 
     try:
-        # Check previously downloaded chapter
-        file_name = get_chapter_filename(app, chapter)
-        if os.path.exists(file_name):
-            logger.debug("Restoring from %s", file_name)
-            with open(file_name, "r", encoding="utf-8") as file:
-                old_chapter = json.load(file)
-            chapter.update(**old_chapter)
-        if chapter.get("body") and chapter.get("success", True):
-            return
+        # Wait for the chapter, if it is being prefetched
+        if prefetch:
+            wait([prefetch])
+
+        if app.prefetch_store and chapter["id"] in app.prefetch_store:
+            logger.debug("Restoring prefetched chapter %d", chapter["id"])
+            # The title and volume of the chapter are formatted since
+            prefetched = app.prefetch_store.get(chapter["id"]) or {}
+            chapter["body"] = prefetched.get("body")
+            chapter["images"] = prefetched.get("images") or {}
+            chapter["success"] = True
 
         # Fetch chapter body if it does not exists
-        logger.debug("Downloading chapter %d: %s", chapter["id"], chapter["url"])
-        chapter["body"] = app.crawler.download_chapter_body(chapter)
-        extract_chapter_images(app, chapter)
-        chapter["success"] = True
+        if not (chapter.get("body") and chapter.get("success", True)):
+            fetch_chapter_body(app, chapter)
     finally:
         chapter["body"] = chapter.get("body") or ""
         save_chapter_body(app, chapter)
         app.progress += 1
 
+    # Failed chapters are queued after they are retried
+    queue_chapter_images(app, chapter)
+
+
+def retry_chapter_body(app, chapter):
+    fetch_chapter_body(app, chapter)
+    save_chapter_body(app, chapter)
+    queue_chapter_images(app, chapter)
+
+
+def _is_browser_available() -> bool:
+    """
+    Checks the browser packages without importing them. The driver is only
+    installed when the browser is used for the first time.
+    """
+    return all(importlib.util.find_spec(name) for name in BROWSER_MODULES)
+
+
+@contextmanager
+def escalated_strategy(app, attempt: int, chapters: List[Chapter]):
+    """
+    Applies the retry strategies for the given attempt cumulatively, and
+    reverts them afterwards. Yields the number of chapters to download
+    concurrently, or 0 to use the default.
+
+    1. Longer timeouts, up to `MAX_RETRY_TIMEOUT`
+    2. A different user agent and mirror, and the proxies if there are any
+    3. Lower concurrency
+    4. Headless browser, if available
+    """
+    from .app import App
+
+    assert isinstance(app, App)
+    assert app.crawler is not None
+
+    crawler = app.crawler
+    old_timeout = crawler.request_timeout
+    old_home_url = crawler.home_url
+    old_auto_proxy = crawler.enable_auto_proxy
+    old_use_browser = crawler.use_browser
+    old_urls = [chapter["url"] for chapter in chapters]
+    window = 0
+    try:
+        crawler.request_timeout = tuple(
+            max(x, min(x * RETRY_TIMEOUT_SCALE, MAX_RETRY_TIMEOUT)) for x in old_timeout
+        )
+
+        if attempt >= 2:
+            crawler.change_user_agent()
+            if has_proxies(crawler.origin.scheme):
+                # a different proxy is picked for every request
+                crawler.enable_auto_proxy = True
+            mirrors = [
+                url
+                for url in crawler.base_url
+                if url.strip("/") != old_home_url.strip("/")
+            ]
+            if mirrors:
+                mirror = mirrors[(attempt - 2) % len(mirrors)]
+                logger.info("Using mirror: %s", mirror)
+                crawler.home_url = mirror
+                for chapter in chapters:
+                    if chapter["url"].startswith(old_home_url):
+                        path = chapter["url"][len(old_home_url) :]
+                        chapter["url"] = mirror + path
+
+        if attempt >= 3:
+            window = 2
+
+        if attempt >= 4 and _is_browser_available():
+            logger.info("Using headless browser")
+            crawler.use_browser = True
+            window = 1
+
+        yield window
+    finally:
+        crawler.request_timeout = old_timeout
+        crawler.home_url = old_home_url
+        crawler.enable_auto_proxy = old_auto_proxy
+        crawler.use_browser = old_use_browser
+        for chapter, url in zip(chapters, old_urls):
+            chapter["url"] = url
 
-def download_chapters(app):
+
+def download_chapters(app) -> List[Tuple[Chapter, Exception]]:
     from .app import App
 
     assert isinstance(app, App)
@@ -123,23 +278,130 @@ def download_chapters(app):
     if not app.output_formats:
         app.output_formats = {}
 
-    app.progress = 0
-    futures = [
-        app.crawler.executor.submit(
-            download_chapter_body,
-            app,
-            chapter,
+    # The prefetched chapters are restored by `download_chapter_body`
+    selected = set(chapter["id"] for chapter in app.chapters)
+    for chapter_id in list(app.prefetch_futures):
+        if chapter_id not in selected:
+            app.prefetch_futures.pop(chapter_id).cancel()
+
+    errors: Dict[int, List[str]] = {}
+
+    def _resolve(fn, chapters, **kwargs):
+        result = app.crawler.resolve_in_window(
+            partial(fn, app),
+            chapters,
+            unit="item",
+            max_failure_rate=MAX_FAILURE_RATE,
+            **kwargs,
         )
-        for chapter in app.chapters
-    ]
+        for chapter, e in result:
+            if not isinstance(e, AbortedException):
+                errors.setdefault(chapter["id"], []).append(
+                    f"{e.__class__.__name__}: {e}"
+                )
+        return result
 
+    app.progress = 0
+    failed = []
     try:
-        app.crawler.resolve_futures(futures, desc="Chapters", unit="item")
+        failed = _resolve(download_chapter_body, app.chapters, desc="Chapters")
     finally:
-        logger.info("Processed %d chapters" % app.progress)
+        logger.info("Processed %d chapters [%d failed]", app.progress, len(failed))
+
+    # Retry the failed chapters at the end of the pass
+    for attempt in range(1, MAX_RETRY_ATTEMPTS + 1):
+        if not failed:
+            break
+
+        # The chapters skipped by an aborted pass are downloaded as usual,
+        # as they can be stored or prefetched. Only the failed ones are
+        # retried with the escalated strategies.
+        skipped = [c for c, e in failed if isinstance(e, AbortedException)]
+        chapters = [c for c, e in failed if not isinstance(e, AbortedException)]
+        failed = []
+        if skipped:
+            logger.info("Downloading %d skipped chapters", len(skipped))
+            failed += _resolve(download_chapter_body, skipped, desc="Chapters")
+        if chapters:
+            logger.info("Retrying %d failed chapters [#%d]", len(chapters), attempt)
+            with escalated_strategy(app, attempt, chapters) as window:
+                failed += _resolve(
+                    retry_chapter_body,
+                    chapters,
+                    window=window,
+                    desc=f" Retry #{attempt}",
+                )
+
+    discard_prefetched(app)
+    app.failed_chapters = {}
+    for chapter, e in failed:
+        chapter["body"] = chapter.get("body") or ""
+        app.failed_chapters[chapter["id"]] = errors.get(chapter["id"]) or [
+            f"{e.__class__.__name__}: {e}"
+        ]
+        queue_chapter_images(app, chapter)
+    journal_event(app, session={"failed_chapters": app.failed_chapters})
 
+    if failed:
+        logger.error("Failed to download %d chapters", len(failed))
 
-def download_image(app, url) -> Image.Image:
+    return failed
+
+
+def prefetch_chapter_body(app, chapter: Chapter):
+    assert app.prefetch_store is not None
+    fetch_chapter_body(app, chapter)
+    app.prefetch_store.put(chapter)
+    chapter["body"] = None  # kept in the store until it is downloaded
+
+
+def prefetch_chapters(app, chapters: Iterable[Chapter]):
+    """
+    Starts downloading the chapter bodies from a stream of chapters, e.g. from
+    `Crawler.stream_novel_info`, while the rest of the TOC is being read.
+
+    The output path can be changed until the download starts, so the bodies
+    are kept in a temporary store. They are moved to the store of the output
+    path by `download_chapters`. The chapters that are downloaded to the
+    default output path already are skipped.
+    """
+    from .app import App
+
+    assert isinstance(app, App)
+    assert app.crawler is not None
+
+    if not app.prefetch_store:
+        app.prefetch_store = ChapterStore(tempfile.mkdtemp(prefix="lncrawl_"))
+
+    downloaded = None
+    for chapter in chapters:
+        if downloaded is None:
+            # The novel title is known by the first chapter
+            downloaded = downloaded_chapter_ids(app.default_output_path())
+        if chapter["id"] in downloaded or chapter["id"] in app.prefetch_futures:
+            continue
+        if not isinstance(chapter, Chapter):
+            chapter = Chapter.from_dict(chapter)
+        app.prefetch_futures[chapter["id"]] = app.crawler.executor.submit(
+            prefetch_chapter_body, app, chapter
+        )
+
+    logger.info("Prefetching %d chapters", len(app.prefetch_futures))
+
+
+def discard_prefetched(app):
+    """Cancels the prefetching, and removes the chapters that were not used"""
+    for future in app.prefetch_futures.values():
+        future.cancel()
+    app.prefetch_futures = {}
+
+    if app.prefetch_store:
+        app.prefetch_store.close()
+        shutil.rmtree(os.path.dirname(app.prefetch_store.file_name), True)
+        app.prefetch_store = None
+
+
+def download_image_data(app, url) -> bytes:
     from .app import App
 
     assert isinstance(app, App)
@@ -147,11 +409,27 @@ def download_image(app, url) -> Image.Image:
 
     assert url, "Invalid image url"
     if len(url) > 1000 or url.startswith("data:"):
-        content = base64.b64decode(url.split("base64,")[-1])
-    else:
-        content = app.crawler.download_image(url)
+        return base64.b64decode(url.split("base64,")[-1])
+    return app.crawler.download_image(url)
+
+
+def download_image(app, url) -> Image.Image:
+    return Image.open(BytesIO(download_image_data(app, url)))
+
 
-    return Image.open(BytesIO(content))
+def prefetch_cover(app):
+    """Start downloading the cover image as soon as its url is known"""
+    from .app import App
+
+    assert isinstance(app, App)
+    assert app.crawler is not None
+
+    url = app.crawler.novel_cover
+    if not url or app.prefetched_cover:
+        return
+
+    logger.info("Prefetching cover image: %s", url)
+    app.prefetched_cover = app.crawler.executor.submit(download_image_data, app, url)
 
 
 def download_file_image(app):
@@ -166,9 +444,16 @@ def download_file_image(app):
         try:
             url = app.crawler.novel_cover
             logger.info("Downloading cover image: %s", url)
-            img = download_image(app, url)
-            img.convert("RGB").save(filename, "JPEG")
-            logger.debug("Saved cover: %s", filename)
+            if app.prefetched_cover:
+                data = app.prefetched_cover.result()
+            else:
+                data = download_image_data(app, url)
+            profile = get_image_profile()
+            profile.image_format = "JPEG"  # the cover is always cover.jpg
+            data, report = prepare_image(data, profile)
+            with open(filename, "wb") as f:
+                f.write(data)
+            logger.debug("Saved cover: %s | %s", filename, report)
         except Exception as e:
             logger.exception("Failed to download cover: %s | %s", url, e)
 
@@ -178,55 +463,187 @@ def download_file_image(app):
         except Exception as e:
             logger.debug("Failed to generate cover: %s | %s", e)
 
-    app.progress += 1
     if not os.path.isfile(filename):
         return f"[{filename}] Failed to get cover image"
 
     app.book_cover = filename
 
 
+def check_image_profile(app):
+    """
+    Removes the images saved with another profile, so that they are
+    processed again with the current one. The format is not compared,
+    because the images keep the format of their names in the chapters.
+    """
+    from .app import App
+
+    assert isinstance(app, App)
+
+    profile = get_image_profile()
+    profile.image_format = "JPEG"
+    current = profile_key(profile) or "original"
+
+    image_folder = os.path.join(app.output_path, "images")
+    profile_file = os.path.join(image_folder, IMAGE_PROFILE_FILE_NAME)
+    previous = "original"  # saved before the profiles
+    if os.path.isfile(profile_file):
+        with open(profile_file, "r", encoding="utf-8") as f:
+            previous = f.read().strip()
+
+    if previous != current and os.path.isdir(image_folder):
+        logger.info("Processing the images again for %s profile", current)
+        shutil.rmtree(image_folder, ignore_errors=True)
+        cover_file = os.path.join(app.output_path, "cover.jpg")
+        if os.path.isfile(cover_file):
+            os.remove(cover_file)
+
+    os.makedirs(image_folder, exist_ok=True)
+    with open(profile_file, "w", encoding="utf-8") as f:
+        f.write(current)
+
+
 def download_content_image(app, url, filename, image_folder):
     from .app import App
 
     assert isinstance(app, App)
     image_file = os.path.join(image_folder, filename)
-    try:
-        if os.path.isfile(image_file):
+    if os.path.isfile(image_file):
+        return
+
+    os.makedirs(image_folder, exist_ok=True)
+    profile = get_image_profile()
+    # the stored chapters refer to the images by their names
+    profile.image_format = image_format_of(filename)
+    cache_key = profile_key(profile) + url
+    cache = get_image_cache()
+    if cache:
+        cached_file = cache.get(cache_key)
+        if cached_file:
+            try:
+                link_file(cached_file, image_file)
+                logger.debug("Linked cached image: %s", image_file)
+                return
+            except OSError as e:
+                logger.debug("Failed to link cached image: %s | %s", url, e)
+
+    data = download_image_data(app, url)
+    data, report = prepare_image(data, profile)
+    with app.image_lock:
+        app.image_reports[filename] = report
+
+    if cache:
+        try:
+            link_file(cache.put(cache_key, data), image_file)
+            logger.debug("Saved image: %s | %s", image_file, report)
             return
+        except OSError as e:
+            # it might be evicted by another process meanwhile
+            logger.debug("Failed to link cached image: %s | %s", url, e)
 
-        img = download_image(app, url)
-        os.makedirs(image_folder, exist_ok=True)
-        with open(image_file, "wb") as f:
-            img.convert("RGB").save(f, "JPEG")
-            logger.debug("Saved image: %s", image_file)
-    finally:
-        app.progress += 1
+    with open(image_file, "wb") as f:
+        f.write(data)
+    logger.debug("Saved image: %s | %s", image_file, report)
 
 
-def discard_failed_images(app, chapter, failed):
+def queue_chapter_images(app, chapter):
+    """
+    Start downloading the images of a chapter as soon as it is parsed.
+    When all of them are done, the failed ones are discarded from the
+    chapter and `App.on_chapter_ready` is called.
+    """
     from .app import App
 
     assert isinstance(app, App)
     assert app.crawler is not None
     assert isinstance(chapter, dict), "Invalid chapter"
 
-    if not chapter["body"] or "images" not in chapter:
-        return
+    images = chapter.get("images") or {}
+    image_folder = os.path.join(app.output_path, "images")
 
-    assert isinstance(chapter["images"], dict)
-    current_failed = [filename for filename in failed if filename in chapter["images"]]
-    if not current_failed:
-        return
+    pending = set()
+    with app.image_lock:
+        app.unready_chapters += 1
+        for filename, url in images.items():
+            # to find the chapters of the failed images later
+            app.image_chapters.setdefault(filename, []).append(chapter)
+            if filename not in app.image_futures:
+                app.image_futures[filename] = app.crawler.executor.submit(
+                    download_content_image,
+                    app,
+                    url,
+                    filename,
+                    image_folder,
+                )
+            pending.add(app.image_futures[filename])
+
+    def _on_done(future=None):
+        with app.image_lock:
+            pending.discard(future)
+            if pending:
+                return
+        try:
+            failed = [
+                filename
+                for filename in images
+                if not os.path.isfile(os.path.join(image_folder, filename))
+            ]
+            discard_failed_images(app, chapter, failed)
+            # The body is persisted by now. Binders read it back from the store.
+            chapter["body"] = None
+            app.on_chapter_ready(chapter)
+        finally:
+            with app.image_lock:
+                app.unready_chapters -= 1
+                app.chapters_ready.notify_all()
+
+    if not pending:
+        _on_done()
+    for future in list(pending):
+        future.add_done_callback(_on_done)
 
-    soup = app.crawler.make_soup(chapter["body"])
-    for filename in current_failed:
-        chapter["images"].pop(filename)
-        for img in soup.select(f'img[alt="{filename}"]'):
-            img.extract()
 
-    soup_body = soup.select_one("body")
-    assert soup_body
-    chapter["body"] = "".join([str(x) for x in soup_body.contents])
+def discard_failed_images(app, chapter, failed):
+    """
+    Removes the failed images from a chapter and its body. It can be called
+    from the callbacks of the images and after all of them are done, so the
+    chapter is updated under the image lock, only once for every image.
+    """
+    from .app import App
+
+    assert isinstance(app, App)
+    assert app.store is not None
+    assert isinstance(chapter, dict), "Invalid chapter"
+
+    failed = set(failed)
+    with app.image_lock:
+        images = chapter.get("images")
+        if not images:
+            return
+
+        assert isinstance(images, dict)
+        current_failed = {filename for filename in images if filename in failed}
+        if not current_failed:
+            return
+
+        spilled = chapter.get("body") is None
+        body = app.store.read_body(chapter)
+        if not body:
+            return
+
+        # The tags are written by `extract_chapter_images` with the file name as alt
+        def _remove_failed(match):
+            alt = IMG_ALT_RE.search(match.group(0))
+            if alt and alt.group(1) in current_failed:
+                return ""
+            return match.group(0)
+
+        for filename in current_failed:
+            images.pop(filename, None)
+        chapter["body"] = IMG_TAG_RE.sub(_remove_failed, body)
+        app.store.put(chapter)
+        journal_chapter(app, chapter)
+        if spilled:
+            chapter["body"] = None
 
 
 def download_chapter_images(app):
@@ -236,44 +653,48 @@ def download_chapter_images(app):
     assert app.crawler is not None
 
     # download or generate cover
+    futures = []
+    if not app.cover_future:
+        app.cover_future = app.crawler.executor.submit(download_file_image, app)
+    futures.append(app.cover_future)
+
+    # content images are queued as soon as the chapters are downloaded
+    with app.image_lock:
+        futures += list(app.image_futures.values())
+
+    # Count the images as they are done, including the ones done already
     app.progress = 0
-    futures = [
-        app.crawler.executor.submit(
-            download_file_image,
-            app,
-        )
-    ]
 
-    # download content images
-    image_folder = os.path.join(app.output_path, "images")
-    images_to_download = set(
-        [
-            (filename, url)
-            for chapter in app.chapters
-            for filename, url in chapter.get("images", {}).items()
-        ]
-    )
-    futures += [
-        app.crawler.executor.submit(
-            download_content_image,
-            app,
-            url,
-            filename,
-            image_folder,
-        )
-        for filename, url in images_to_download
-    ]
+    def _count_image(future):
+        with app.image_lock:
+            app.progress += 1
+
+    for future in futures:
+        future.add_done_callback(_count_image)
 
+    image_folder = os.path.join(app.output_path, "images")
     failed = []
     try:
         app.crawler.resolve_futures(futures, desc="  Images", unit="item")
         failed = [
             filename
-            for filename, url in images_to_download
+            for filename in app.image_futures
             if not os.path.isfile(os.path.join(image_folder, filename))
         ]
     finally:
         logger.info("Processed %d images [%d failed]" % (app.progress, len(failed)))
-
-    for chapter in app.chapters:
+        with app.image_lock:
+            log_image_reports(list(app.image_reports.values()))
+
+    # The callbacks of the futures can still be running
+    with app.image_lock:
+        app.chapters_ready.wait_for(lambda: app.unready_chapters <= 0)
+
+    # Only the chapters having the failed images
+    affected: Dict[int, Chapter] = {}
+    with app.image_lock:
+        for filename in failed:
+            for chapter in app.image_chapters.get(filename, []):
+                affected[id(chapter)] = chapter
+    for chapter in affected.values():
         discard_failed_images(app, chapter, failed)
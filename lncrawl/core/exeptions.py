@@ -1,3 +1,7 @@
 class LNException(Exception):
     def __init__(self, *args: object) -> None:
         super().__init__(*args)
+
+
+class AbortedException(LNException):
+    """The task was not attempted, because too many of the others failed"""
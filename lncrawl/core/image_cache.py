@@ -0,0 +1,165 @@
+"""
+To share the downloaded images between novels
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Optional
+
+from .arguments import get_args
+
+logger = logging.getLogger(__name__)
+
+IMAGE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".lncrawl", "images")
+INDEX_FILE_NAME = "index.db"
+DEFAULT_CACHE_SIZE_MB = 0  # disabled, unless it is asked for
+# Evicts a bit more than needed, so that it is not done for every new image
+EVICT_TO_RATIO = 0.9
+
+__cache: Optional["ImageCache"] = None
+__cache_lock = Lock()
+__cache_failed = False
+
+
+class ImageCache:
+    """
+    Keeps the images in a folder shared by all novels. The files are named by
+    the hash of their content, so an image is stored once even if it is found
+    at different urls. The least recently used images are removed when the
+    total size grows beyond `max_size` bytes.
+
+    The images are put in the output folders as hardlinks of these files,
+    see `utils.files.link_file`.
+    """
+
+    def __init__(self, root: str, max_size: int) -> None:
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.max_size = max_size
+
+        self._lock = Lock()
+        self._db = sqlite3.connect(
+            os.path.join(root, INDEX_FILE_NAME),
+            timeout=30,  # shared by other processes
+            check_same_thread=False,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            "key TEXT PRIMARY KEY, "
+            "digest TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            "digest TEXT PRIMARY KEY, "
+            "size INTEGER NOT NULL, "
+            "used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS objects_used ON objects (used)")
+        self._db.commit()
+
+    def path_of(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + ".jpg")
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the path of the image saved for the key, e.g. its url"""
+        key = self._hash_key(key)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest FROM urls WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+
+            path = self.path_of(row[0])
+            if not os.path.isfile(path):
+                self._forget(row[0])
+                self._db.commit()
+                return None
+
+            self._db.execute(
+                "UPDATE objects SET used = ? WHERE digest = ?",
+                (time.time(), row[0]),
+            )
+            self._db.commit()
+            return path
+
+    def put(self, key: str, data: bytes) -> str:
+        """Saves the image for the key, and returns its path"""
+        key = self._hash_key(key)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_of(digest)
+        with self._lock:
+            if not os.path.isfile(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_file = "%s.%d.tmp" % (path, os.getpid())
+                with open(tmp_file, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_file, path)
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO objects (digest, size, used) VALUES (?, ?, ?)",
+                (digest, len(data), time.time()),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO urls (key, digest) VALUES (?, ?)",
+                (key, digest),
+            )
+            self._evict(keep=digest)
+            self._db.commit()
+        return path
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _hash_key(self, key: str) -> str:
+        # the urls can be long, e.g. base64 encoded images
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def _forget(self, digest: str) -> None:
+        self._db.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+        self._db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+
+    def _evict(self, keep: str) -> None:
+        total = self._db.execute("SELECT SUM(size) FROM objects").fetchone()[0] or 0
+        if total <= self.max_size:
+            return
+
+        target = self.max_size * EVICT_TO_RATIO
+        rows = self._db.execute(
+            "SELECT digest, size FROM objects ORDER BY used"
+        ).fetchall()
+        for digest, size in rows:
+            if total <= target:
+                break
+            if digest == keep:
+                continue
+            # The hardlinks in the output folders are not affected
+            try:
+                os.remove(self.path_of(digest))
+            except OSError:
+                pass
+            self._forget(digest)
+            total -= size
+        logger.debug("Image cache is reduced to %d bytes", total)
+
+
+def get_image_cache() -> Optional[ImageCache]:
+    """The shared image cache, or None if it is disabled"""
+    global __cache, __cache_failed
+    size_mb = getattr(get_args(), "image_cache_size", DEFAULT_CACHE_SIZE_MB)
+    if not size_mb or size_mb <= 0:
+        return None
+
+    with __cache_lock:
+        if __cache is None and not __cache_failed:
+            try:
+                __cache = ImageCache(IMAGE_CACHE_PATH, size_mb * 1024 * 1024)
+            except Exception as e:
+                __cache_failed = True
+                logger.warning("Image cache is not available. Error: %s", e)
+        return __cache
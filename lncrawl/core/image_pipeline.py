@@ -0,0 +1,149 @@
+"""
+To prepare the downloaded images for the e-readers
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from threading import Lock
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from ..models import ImageProfile, ImageReport
+from .arguments import get_args
+
+logger = logging.getLogger(__name__)
+
+IMAGE_WORKERS = min(4, os.cpu_count() or 1)
+
+IMAGE_PROFILES = {
+    "original": ImageProfile(),
+    "kindle": ImageProfile(1072, 1448, grayscale=True, quality=80),
+    "kobo": ImageProfile(1264, 1680, grayscale=True, quality=80),
+    "tablet": ImageProfile(1600, 2560, quality=85),
+    "phone": ImageProfile(1080, 2340, quality=80),
+}
+
+__executor: Optional[ProcessPoolExecutor] = None
+__executor_lock = Lock()
+__executor_failed = False
+
+
+def get_image_profile() -> ImageProfile:
+    """The profile selected by the arguments"""
+    args = get_args()
+    name = getattr(args, "image_profile", None) or "original"
+    profile = IMAGE_PROFILES.get(name, IMAGE_PROFILES["original"]).copy()
+    if getattr(args, "webp_images", False):
+        profile.image_format = "WEBP"
+    return profile
+
+
+def image_extension(profile: ImageProfile) -> str:
+    return ".webp" if profile.image_format == "WEBP" else ".jpg"
+
+
+def image_format_of(filename: str) -> str:
+    """The format of an image file, see `image_extension`"""
+    return "WEBP" if filename.endswith(".webp") else "JPEG"
+
+
+def profile_key(profile: ImageProfile) -> str:
+    """To tell apart the images processed with different profiles"""
+    if profile == IMAGE_PROFILES["original"]:
+        return ""  # same as the images saved before the profiles
+    return (
+        "%(max_width)dx%(max_height)d-%(grayscale)d-%(quality)d-%(image_format)s"
+        % profile
+    )
+
+
+def process_image(data: bytes, profile: ImageProfile) -> Tuple[bytes, ImageReport]:
+    """
+    Converts an image to fit the profile. A JPEG that fits already is
+    returned as it is. Big JPEGs are decoded at a reduced scale in draft
+    mode, so that they are never fully decoded in memory.
+    """
+    start = time.perf_counter()
+    img = Image.open(BytesIO(data))  # only reads the header
+    report = ImageReport(source_bytes=len(data), source_size=img.size)
+
+    max_size = (profile.max_width or img.width, profile.max_height or img.height)
+    fits = img.width <= max_size[0] and img.height <= max_size[1]
+    modes = ("L",) if profile.grayscale else ("RGB", "L")
+    if profile.image_format == "JPEG" and img.format == "JPEG":
+        if fits and img.mode in modes:
+            report.action = "passthrough"
+            report.output_bytes = len(data)
+            report.output_size = img.size
+            report.seconds = time.perf_counter() - start
+            return data, report
+
+    mode = "L" if profile.grayscale else "RGB"
+    if not fits:
+        img.draft(mode, max_size)
+        img.thumbnail(max_size, Image.LANCZOS)
+    img = img.convert(mode)
+
+    with BytesIO() as buffer:
+        img.save(buffer, profile.image_format, quality=profile.quality)
+        output = buffer.getvalue()
+
+    report.action = "encoded"
+    report.output_bytes = len(output)
+    report.output_size = img.size
+    report.seconds = time.perf_counter() - start
+    return output, report
+
+
+def __get_executor() -> Optional[ProcessPoolExecutor]:
+    global __executor, __executor_failed
+    with __executor_lock:
+        if __executor is None and not __executor_failed and IMAGE_WORKERS > 1:
+            try:
+                # spawn does not copy the locks held by the other threads of the app
+                __executor = ProcessPoolExecutor(
+                    max_workers=IMAGE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                atexit.register(__executor.shutdown, False)
+            except Exception as e:
+                __executor_failed = True
+                logger.warning("Processing images without workers. Error: %s", e)
+        return __executor
+
+
+def prepare_image(data: bytes, profile: ImageProfile) -> Tuple[bytes, ImageReport]:
+    """
+    Processes an image in a pool of processes, so that the decoding and the
+    encoding do not hold the download threads back.
+    """
+    executor = __get_executor()
+    if executor:
+        try:
+            return executor.submit(process_image, data, profile).result()
+        except BrokenProcessPool as e:
+            logger.debug("Image worker has stopped: %s", e)
+    return process_image(data, profile)
+
+
+def log_image_reports(reports) -> None:
+    if not reports:
+        return
+    passed = sum(1 for x in reports if x.action == "passthrough")
+    source_bytes = sum(x.source_bytes for x in reports)
+    output_bytes = sum(x.output_bytes for x in reports)
+    seconds = sum(x.seconds for x in reports)
+    logger.info(
+        "Prepared %d images [%d passed through]: %.2f MB to %.2f MB in %.2fs",
+        len(reports),
+        passed,
+        source_bytes / 1024 / 1024,
+        output_bytes / 1024 / 1024,
+        seconds,
+    )
@@ -1,6 +1,8 @@
+import json
 import math
 import os
 import re
+from threading import Lock
 from typing import Dict
 
 from .. import constants as C
@@ -8,8 +10,10 @@ from ..models import Chapter, MetaInfo, Novel, Session, Volume
 from .crawler import Crawler
 from .exeptions import LNException
 
+__journal_lock = Lock()
 
-def __format_title(text):
+
+def format_title(text):
     return re.sub(r"\s+", " ", str(text)).strip().title()
 
 
@@ -26,7 +30,7 @@ def __format_volume(crawler: Crawler, vol_id_map: Dict[int, int]):
     for index, vol in enumerate(crawler.volumes):
         if not isinstance(vol.id, int) or vol["id"] < 0:
             raise LNException(f"Invalid volume id at index {index}")
-        vol.title = __format_title(vol.title or f"Volume {vol.id}")
+        vol.title = format_title(vol.title or f"Volume {vol.id}")
         vol.start_chapter = len(crawler.chapters)
         vol.final_chapter = 0
         vol.chapter_count = 0
@@ -52,7 +56,7 @@ def __format_chapters(crawler: Crawler, vol_id_map: Dict[int, int]):
         volume = crawler.volumes[vol_index]
         item.volume = volume.id
         item.volume_title = volume.title
-        item.title = __format_title(item.title or f"#{item.id}")
+        item.title = format_title(item.title or f"#{item.id}")
 
         volume.start_chapter = min(volume.start_chapter, item.id)
         volume.final_chapter = max(volume.final_chapter, item.id)
@@ -60,8 +64,8 @@ def __format_chapters(crawler: Crawler, vol_id_map: Dict[int, int]):
 
 
 def format_novel(crawler: Crawler):
-    crawler.novel_title = __format_title(crawler.novel_title)
-    crawler.novel_author = __format_title(crawler.novel_author)
+    crawler.novel_title = format_title(crawler.novel_title)
+    crawler.novel_author = format_title(crawler.novel_author)
     vol_id_map: Dict[int, int] = {}
     __format_volume(crawler, vol_id_map)
     __format_chapters(crawler, vol_id_map)
@@ -98,9 +102,84 @@ def save_metadata(app, completed=False):
             cookies=app.crawler.cookies,
             headers=app.crawler.headers,
             proxies=app.crawler.scraper.proxies,
+            failed_chapters=app.failed_chapters,
         ),
     )
 
     os.makedirs(app.output_path, exist_ok=True)
     file_name = os.path.join(app.output_path, C.META_FILE_NAME)
     novel.to_json(file_name, encoding="utf-8", indent=2)
+
+    # The journal only holds changes made after the latest snapshot
+    journal_file = os.path.join(app.output_path, C.META_JOURNAL_FILE_NAME)
+    with __journal_lock:
+        app.chapter_states = {
+            chap.id: __chapter_state(chap) for chap in app.crawler.chapters
+        }
+        if app.journal:
+            app.journal.close()
+            app.journal = None
+        if completed:
+            if os.path.isfile(journal_file):
+                os.remove(journal_file)
+        else:
+            app.journal = open(journal_file, "w", encoding="utf-8")
+
+
+def journal_event(app, **event):
+    """
+    Appends a change to the journal next to `meta.json`. Use `chapter` to
+    update a chapter by id, or `session` to update the session fields.
+    """
+    with __journal_lock:
+        if not app.journal:
+            return
+        app.journal.write(json.dumps(event, ensure_ascii=False) + "\n")
+        app.journal.flush()
+
+
+def __chapter_state(chapter: Chapter) -> dict:
+    return {
+        "id": chapter["id"],
+        "success": bool(chapter.get("success", False)),
+        "images": dict(chapter.get("images") or {}),
+    }
+
+
+def journal_chapter(app, chapter: Chapter):
+    """Appends the state of a chapter to the journal, if it has changed"""
+    state = __chapter_state(chapter)
+    with __journal_lock:
+        if app.chapter_states.get(chapter["id"]) == state:
+            return
+        app.chapter_states[chapter["id"]] = state
+    journal_event(app, chapter=state)
+
+
+def load_metadata(meta_file: str) -> MetaInfo:
+    """Reads `meta.json` and replays the journal of changes made after it"""
+    with open(meta_file, "r", encoding="utf-8") as fp:
+        meta = json.load(fp)
+
+    novel = Novel.from_dict(meta["novel"])
+    novel.volumes = [Volume.from_dict(x) for x in novel.volumes]
+    novel.chapters = [Chapter.from_dict(x) for x in novel.chapters]
+    session = Session.from_dict(meta["session"])
+
+    journal_file = os.path.join(os.path.dirname(meta_file), C.META_JOURNAL_FILE_NAME)
+    if os.path.isfile(journal_file):
+        chapters = {chapter.id: chapter for chapter in novel.chapters}
+        with open(journal_file, "r", encoding="utf-8") as fp:
+            for line in fp:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    break  # the process died while writing this line
+                if "chapter" in event:
+                    chapter = chapters.get(event["chapter"]["id"])
+                    if chapter is not None:
+                        chapter.update(event["chapter"])
+                if "session" in event:
+                    session.update(event["session"])
+
+    return MetaInfo(novel=novel, session=session)
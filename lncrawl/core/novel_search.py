@@ -3,32 +3,70 @@ To search for novels in selected sources
 """
 import logging
 import os
+import time
 from concurrent import futures
-from typing import Dict, List
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 from slugify import slugify
 from tqdm import tqdm
 
 from ..core.sources import crawler_list, prepare_crawler
 from ..models import CombinedSearchResult, SearchResult
+from .search_cache import SearchCache, get_search_cache, get_search_ttl
 
-SEARCH_TIMEOUT = 10
+SEARCH_TIMEOUT = 20  # seconds for the whole search
 
 logger = logging.getLogger(__name__)
 executor = futures.ThreadPoolExecutor(20)
 
+__refreshing: Set[Tuple[str, str]] = set()
+__refreshing_lock = Lock()
+
+
+def _search_source(link: str, query: str) -> List[SearchResult]:
+    crawler = prepare_crawler(link)
+    results = crawler.search_novel(query)
+    logger.debug(results)
+    return [
+        item if isinstance(item, SearchResult) else SearchResult(**item)
+        for item in results
+        if item.get("url")
+    ]
+
+
+def _refresh_search(cache: SearchCache, link: str, query: str):
+    try:
+        cache.put(link, query, _search_source(link, query))
+        logger.debug("Refreshed search results of %s", link)
+    except Exception as e:
+        logger.debug("Failed to refresh search results of %s: %s", link, e)
+    finally:
+        with __refreshing_lock:
+            __refreshing.discard((link, query))
+
 
 def _perform_search(app, link, bar):
+    query = app.user_input
+    cache = get_search_cache()
     try:
-        crawler = prepare_crawler(link)
-        results = crawler.search_novel(app.user_input)
-        logger.debug(results)
-        results = [
-            item if isinstance(item, SearchResult) else SearchResult(**item)
-            for item in results
-            if item.get("url")
-        ]
+        if cache:
+            cached = cache.get(link, query, get_search_ttl(crawler_list[link]))
+            if cached:
+                items, stale = cached
+                if stale:
+                    # Serve the stale results now, and refresh them for later
+                    with __refreshing_lock:
+                        if (link, query) not in __refreshing:
+                            __refreshing.add((link, query))
+                            executor.submit(_refresh_search, cache, link, query)
+                logger.info("%d cached results from %s", len(items), link)
+                return [SearchResult(**item) for item in items]
+
+        results = _search_source(link, query)
         logger.info("%d results from %s", len(results), link)
+        if cache:
+            cache.put(link, query, results)
         return results
     except KeyboardInterrupt as e:
         raise e
@@ -62,7 +100,14 @@ def _combine_results(results: List[SearchResult]) -> List[CombinedSearchResult]:
     return processed[:15]  # Control the number of results
 
 
-def search_novels(app):
+def iter_search_novels(
+    app, timeout: float = SEARCH_TIMEOUT
+) -> Iterator[List[CombinedSearchResult]]:
+    """
+    Searches in all sources in parallel, and yields the combined results found
+    so far every time a source returns any. The sources that are not done
+    before the timeout are cancelled.
+    """
     from .app import App
 
     assert isinstance(app, App)
@@ -82,6 +127,7 @@ def search_novels(app):
     )
 
     # Add future tasks
+    deadline = time.monotonic() + timeout
     checked = {}
     futures_to_check = []
     app.progress = 0
@@ -94,31 +140,49 @@ def search_novels(app):
         future = executor.submit(_perform_search, app, link, bar)
         futures_to_check.append(future)
 
-    # Resolve all futures
+    # Resolve futures as they complete
     results: List[SearchResult] = []
-    for i, f in enumerate(futures_to_check):
-        assert isinstance(f, futures.Future)
-        try:
-            f.result(SEARCH_TIMEOUT)
-        except KeyboardInterrupt:
-            break
-        except TimeoutError:
-            f.cancel()
-        except Exception as e:
-            if is_debug:
-                logger.error("Failed to complete search", e)
-        finally:
+    try:
+        remaining = max(0, deadline - time.monotonic())
+        for f in futures.as_completed(futures_to_check, remaining):
             app.progress += 1
             bar.update()
-
-    # Cancel any remaining futures
-    for f in futures_to_check:
-        assert isinstance(f, futures.Future)
-        if not f.done():
+            try:
+                found = f.result()
+            except Exception as e:
+                if is_debug:
+                    logger.error("Failed to complete search: %s", e)
+                continue
+            if found:
+                results += found
+                yield _combine_results(results)
+    except futures.TimeoutError:
+        logger.info("Search timed out after %d seconds", timeout)
+    finally:
+        # Cancel the stragglers
+        for f in futures_to_check:
             f.cancel()
-        elif not f.cancelled():
-            results += f.result()
-
-    # Process combined search results
-    app.search_results = _combine_results(results)
-    bar.close()
+        bar.close()
+
+
+def search_novels(
+    app,
+    on_update: Optional[Callable[[List[CombinedSearchResult]], None]] = None,
+    timeout: float = SEARCH_TIMEOUT,
+):
+    """
+    Sets the combined results of all sources to `app.search_results`.
+    `on_update` is called with the results found so far, as they arrive.
+    """
+    app.search_results = []
+    try:
+        for results in iter_search_novels(app, timeout):
+            app.search_results = results
+            if on_update:
+                on_update(results)
+    except KeyboardInterrupt:
+        pass  # keep the results found so far
+
+    cache = get_search_cache()
+    if cache:
+        cache.log_stats()
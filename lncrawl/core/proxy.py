@@ -74,6 +74,11 @@ def get_a_proxy(scheme: str = "http", timeout: int = 0):
     return url
 
 
+def has_proxies(scheme: str = "http") -> bool:
+    """Whether there are any proxies to use for the scheme"""
+    return bool(__proxy_list.get(scheme))
+
+
 def remove_faulty_proxies(faulty_url: str):
     if faulty_url and not __is_private_proxy[faulty_url]:
         __proxy_use_count[faulty_url] = __max_use_per_proxy + 1
@@ -46,6 +46,9 @@ class Scraper(TaskManager, SoupMaker):
         self.home_url = origin
         self.last_visited_url = ""
         self.enable_auto_proxy = os.getenv("use_proxy") == "1"
+        self.request_timeout = (7, 301)  # in seconds
+        self.use_browser = False
+        self.browser = None
 
         self.init_scraper()
         self.change_user_agent()
@@ -198,7 +201,7 @@ class Scraper(TaskManager, SoupMaker):
     def get_response(self, url, **kwargs) -> Response:
         kwargs = kwargs or dict()
         kwargs.setdefault("retry", 3)
-        kwargs.setdefault("timeout", (7, 301))  # in seconds
+        kwargs.setdefault("timeout", self.request_timeout)
 
         result = self.__process_request("get", url, **kwargs)
         self.last_visited_url = url.strip("/")
@@ -231,9 +234,21 @@ class Scraper(TaskManager, SoupMaker):
     def get_soup(self, url, **kwargs) -> BeautifulSoup:
         """Downloads an URL and make a BeautifulSoup object from response"""
         parser = kwargs.pop("parser", None)
+        if self.use_browser:
+            return self.get_browser_soup(url)
         response = self.get_response(url, **kwargs)
         return self.make_soup(response, parser)
 
+    def get_browser_soup(self, url) -> BeautifulSoup:
+        """Loads an URL in a headless chrome browser and make a BeautifulSoup object"""
+        from .chrome import Chrome
+
+        if not self.browser:
+            self.browser = Chrome()
+        soup = self.browser.get_soup(url, cookies=self.scraper.cookies)
+        self.last_visited_url = url.strip("/")
+        return soup
+
     def get_json(self, *args, **kwargs) -> dict:
         kwargs = kwargs or dict()
         headers = kwargs.setdefault("headers", {})
@@ -0,0 +1,180 @@
+"""
+To reuse the search results of the sources for the same queries
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+import unicodedata
+import zlib
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from .arguments import get_args
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".lncrawl", "search.db")
+DEFAULT_CACHE_SIZE_MB = 32
+DEFAULT_SEARCH_TTL = 6 * 3600  # seconds
+# Stale results are still served, while being refreshed, until this many TTLs
+MAX_STALE_RATIO = 8
+# Evicts a bit more than needed, so that it is not done for every new entry
+EVICT_TO_RATIO = 0.9
+
+__cache: Optional["SearchCache"] = None
+__cache_lock = Lock()
+__cache_failed = False
+
+
+def normalize_query(query: str) -> str:
+    """Ignores the case, the spacing and the unicode forms of a query"""
+    query = unicodedata.normalize("NFKC", query or "")
+    return " ".join(query.casefold().split())
+
+
+class SearchCache:
+    """
+    Keeps the search results of every (source, normalized query) in a
+    database shared by all sessions. The results of a source are fresh for
+    its TTL. After that they are stale: they are still returned, but should
+    be refreshed. The least recently used entries are removed when the total
+    size grows beyond `max_size` bytes.
+
+    The hits, the stale hits and the misses are counted per source, see
+    `log_stats`.
+    """
+
+    def __init__(self, file_name: str, max_size: int) -> None:
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        self.max_size = max_size
+        self.stats: Dict[str, List[int]] = {}  # source -> [hits, stale, misses]
+
+        self._lock = Lock()
+        self._db = sqlite3.connect(
+            file_name,
+            timeout=30,  # shared by other processes
+            check_same_thread=False,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, "
+            "source TEXT NOT NULL, "
+            "data BLOB NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "created REAL NOT NULL, "
+            "used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        self._db.commit()
+
+    def get(self, source: str, query: str, ttl: float) -> Optional[Tuple[list, bool]]:
+        """Returns the cached results and whether they are stale, if any"""
+        key = self._hash_key(source, query)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, created FROM results WHERE key = ?", (key,)
+            ).fetchone()
+
+            age = now - row[1] if row else 0
+            if not row or age > ttl * MAX_STALE_RATIO:
+                if row:
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._db.commit()
+                self._count(source, 2)
+                return None
+
+            self._db.execute("UPDATE results SET used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            stale = age > ttl
+            self._count(source, 1 if stale else 0)
+
+        return json.loads(zlib.decompress(row[0])), stale
+
+    def put(self, source: str, query: str, results: list) -> None:
+        key = self._hash_key(source, query)
+        data = zlib.compress(json.dumps(results).encode())
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results "
+                "(key, source, data, size, created, used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, source, data, len(data), now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def log_stats(self) -> None:
+        with self._lock:
+            stats = {k: list(v) for k, v in self.stats.items()}
+        if not stats:
+            return
+        for source, (hits, stale, misses) in sorted(stats.items()):
+            logger.debug(
+                "Search cache of %s: %d hits, %d stale, %d misses",
+                source,
+                hits,
+                stale,
+                misses,
+            )
+        hits, stale, misses = [sum(x) for x in zip(*stats.values())]
+        logger.info(
+            "Search cache: %d hits, %d stale, %d misses [%.0f%% hit rate]",
+            hits,
+            stale,
+            misses,
+            100 * (hits + stale) / max(1, hits + stale + misses),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _hash_key(self, source: str, query: str) -> str:
+        key = source + "\n" + normalize_query(query)
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def _count(self, source: str, index: int) -> None:
+        self.stats.setdefault(source, [0, 0, 0])[index] += 1
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT SUM(size) FROM results").fetchone()[0] or 0
+        if total <= self.max_size:
+            return
+
+        target = self.max_size * EVICT_TO_RATIO
+        rows = self._db.execute("SELECT key, size FROM results ORDER BY used")
+        removed = []
+        for key, size in rows.fetchall():
+            if total <= target:
+                break
+            removed.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM results WHERE key = ?", removed)
+        logger.debug("Search cache is reduced to %d bytes", total)
+
+
+def get_search_ttl(crawler) -> float:
+    """The seconds for which the search results of a crawler are fresh"""
+    return getattr(crawler, "search_cache_ttl", None) or DEFAULT_SEARCH_TTL
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """The shared search cache, or None if it is disabled"""
+    global __cache, __cache_failed
+    size_mb = getattr(get_args(), "search_cache_size", DEFAULT_CACHE_SIZE_MB)
+    if not size_mb or size_mb <= 0:
+        return None
+
+    with __cache_lock:
+        if __cache is None and not __cache_failed:
+            try:
+                __cache = SearchCache(SEARCH_CACHE_FILE, size_mb * 1024 * 1024)
+            except Exception as e:
+                __cache_failed = True
+                logger.warning("Search cache is not available. Error: %s", e)
+        return __cache
@@ -0,0 +1,300 @@
+"""
+To store chapter bodies in a single file
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import zlib
+from queue import Queue
+from threading import Lock, Thread
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+STORE_FILE_NAME = "chapters.db"
+WRITE_BATCH_SIZE = 100
+READ_BATCH_SIZE = 50
+COMPRESSION_LEVEL = 6
+
+
+def downloaded_chapter_ids(output_path: str) -> Set[int]:
+    """Ids of the chapters downloaded to an output path, without opening a store"""
+    file_name = os.path.join(output_path, STORE_FILE_NAME)
+    if not os.path.isfile(file_name):
+        return set()
+    try:
+        db = sqlite3.connect(file_name)
+        try:
+            rows = db.execute("SELECT id FROM chapters WHERE success")
+            return set(row[0] for row in rows)
+        finally:
+            db.close()
+    except sqlite3.Error as e:
+        logger.debug("Failed to read %s | %s", file_name, e)
+        return set()
+
+
+class ChapterStore:
+    """
+    Keeps downloaded chapters in a SQLite database with compressed bodies.
+    Writes are queued and committed in batches by a dedicated thread.
+    """
+
+    def __init__(self, output_path: str) -> None:
+        os.makedirs(output_path, exist_ok=True)
+        self.file_name = os.path.join(output_path, STORE_FILE_NAME)
+
+        self._lock = Lock()
+        self._queue: Queue = Queue()
+        self._pending: Dict[int, bytes] = {}
+        self._db = sqlite3.connect(self.file_name, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chapters ("
+            "id INTEGER PRIMARY KEY, "
+            "volume INTEGER, "
+            "success INTEGER NOT NULL DEFAULT 0, "
+            "data BLOB NOT NULL, "
+            "images TEXT)"
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(chapters)")]
+        if "images" not in columns:
+            # the images are kept apart to restore a chapter without its body
+            self._db.execute("ALTER TABLE chapters ADD COLUMN images TEXT")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS manifests ("
+            "name TEXT PRIMARY KEY, "
+            "data BLOB NOT NULL)"
+        )
+        self._db.commit()
+
+        self._downloaded: Set[int] = set(
+            row[0] for row in self._db.execute("SELECT id FROM chapters WHERE success")
+        )
+        self._stored: Set[int] = set(
+            row[0] for row in self._db.execute("SELECT id FROM chapters")
+        )
+
+        self._writer = Thread(
+            target=self._write_loop,
+            name="lncrawl_store",
+            daemon=True,
+        )
+        self._writer.start()
+
+    def __contains__(self, chapter_id: int) -> bool:
+        """Whether the chapter was downloaded successfully"""
+        return chapter_id in self._downloaded
+
+    def __len__(self) -> int:
+        return len(self._stored)
+
+    def has(self, chapter_id: int) -> bool:
+        """Whether the chapter was stored, even if it failed"""
+        return chapter_id in self._stored
+
+    def put(self, chapter: dict) -> None:
+        """Queue a chapter to be written"""
+        chapter_id = chapter["id"]
+        data = json.dumps(chapter, ensure_ascii=False).encode("utf-8")
+        data = zlib.compress(data, COMPRESSION_LEVEL)
+        images = json.dumps(chapter.get("images") or {}, ensure_ascii=False)
+        row = (
+            chapter_id,
+            chapter.get("volume"),
+            bool(chapter.get("success")),
+            data,
+            images,
+        )
+        with self._lock:
+            self._pending[chapter_id] = data
+            self._stored.add(chapter_id)
+            if row[2]:
+                self._downloaded.add(chapter_id)
+            else:
+                self._downloaded.discard(chapter_id)
+        self._queue.put(row)
+
+    def get(self, chapter_id: int) -> Optional[dict]:
+        """Read a stored chapter"""
+        with self._lock:
+            data = self._pending.get(chapter_id)
+            if data is None:
+                row = self._db.execute(
+                    "SELECT data FROM chapters WHERE id = ?", (chapter_id,)
+                ).fetchone()
+                data = row[0] if row else None
+        if data is None:
+            return None
+        return json.loads(zlib.decompress(data).decode("utf-8"))
+
+    def get_images(self, chapter_id: int) -> Dict[str, str]:
+        """Read the images of a stored chapter, without its body"""
+        with self._lock:
+            if chapter_id in self._pending:
+                row = None
+            else:
+                row = self._db.execute(
+                    "SELECT images FROM chapters WHERE id = ?", (chapter_id,)
+                ).fetchone()
+        if row and row[0] is not None:
+            return json.loads(row[0])
+        # queued, or stored before the images were kept apart
+        stored = self.get(chapter_id) or {}
+        return stored.get("images") or {}
+
+    def read_body(self, chapter: dict) -> str:
+        """
+        Returns the body of a chapter, reading it from the store if it is
+        not loaded in memory.
+        """
+        if chapter.get("body") is not None:
+            return chapter["body"]
+        stored = self.get(chapter["id"]) or {}
+        return stored.get("body") or ""
+
+    def iter_bodies(self, chapters: Iterable[dict]) -> Iterator[Tuple[dict, str]]:
+        """
+        Yields every chapter with its body in the given order, reading the
+        ones that are not in memory from the store in small batches.
+        """
+        batch: List[dict] = []
+        for chapter in chapters:
+            batch.append(chapter)
+            if len(batch) >= READ_BATCH_SIZE:
+                yield from self._read_bodies(batch)
+                batch = []
+        if batch:
+            yield from self._read_bodies(batch)
+
+    def _read_bodies(self, chapters: List[dict]) -> Iterator[Tuple[dict, str]]:
+        missing = [x["id"] for x in chapters if x.get("body") is None]
+        found: Dict[int, bytes] = {}
+        if missing:
+            with self._lock:
+                found = {k: self._pending[k] for k in missing if k in self._pending}
+                ids = [k for k in missing if k not in found]
+                if ids:
+                    rows = self._db.execute(
+                        "SELECT id, data FROM chapters WHERE id IN (%s)"
+                        % ",".join("?" * len(ids)),
+                        ids,
+                    ).fetchall()
+                    found.update(rows)
+
+        for chapter in chapters:
+            body = chapter.get("body")
+            if body is None and chapter["id"] in found:
+                data = json.loads(zlib.decompress(found.pop(chapter["id"])))
+                body = data.get("body")
+            yield chapter, body or ""
+
+    def flush(self) -> None:
+        """Wait for all queued chapters to be written"""
+        self._queue.join()
+
+    def close(self) -> None:
+        if not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._db.close()
+
+    def _write_loop(self) -> None:
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < WRITE_BATCH_SIZE and not self._queue.empty():
+                rows.append(self._queue.get())
+
+            batch = [row for row in rows if row is not None]
+            try:
+                if batch:
+                    self._commit(batch)
+            except Exception:
+                logger.exception("Failed to write %d chapters", len(batch))
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+            if len(batch) < len(rows):
+                return  # closed
+
+    def _commit(self, rows: list) -> None:
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO chapters (id, volume, success, data, images) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+            for chapter_id, _, _, data, _ in rows:
+                if self._pending.get(chapter_id) is data:
+                    self._pending.pop(chapter_id)
+
+    # ------------------------------------------------------------------------- #
+    # Manifests of the bound artifacts
+    # ------------------------------------------------------------------------- #
+
+    def load_manifest(self, name: str) -> dict:
+        """Read the content digests saved by a binder"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM manifests WHERE name = ?", (name,)
+            ).fetchone()
+        if not row:
+            return {}
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def save_manifest(self, name: str, manifest: dict) -> None:
+        data = json.dumps(manifest).encode("utf-8")
+        data = zlib.compress(data, COMPRESSION_LEVEL)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO manifests (name, data) VALUES (?, ?)",
+                (name, data),
+            )
+            self._db.commit()
+
+    # ------------------------------------------------------------------------- #
+    # Import & Export
+    # ------------------------------------------------------------------------- #
+
+    def import_json(self, json_path: str) -> int:
+        """Import the chapters from the legacy per-chapter json files"""
+        count = 0
+        for root, _, files in os.walk(json_path):
+            for file_name in files:
+                if not file_name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(root, file_name), encoding="utf-8") as fp:
+                        chapter = json.load(fp)
+                    if not self.has(chapter["id"]):
+                        self.put(chapter)
+                        count += 1
+                except Exception as e:
+                    logger.debug("Failed to import %s | %s", file_name, e)
+        self.flush()
+        return count
+
+    def export_json(self, json_path: str, by_volume: bool = False) -> int:
+        """Write every chapter to `json/[Volume NN]/NNNNN.json` layout"""
+        self.flush()
+        with self._lock:
+            rows = self._db.execute("SELECT id, volume, data FROM chapters").fetchall()
+
+        for chapter_id, volume, data in rows:
+            dir_name = json_path
+            if by_volume:
+                vol_name = "Volume " + str(volume).rjust(2, "0")
+                dir_name = os.path.join(dir_name, vol_name)
+
+            os.makedirs(dir_name, exist_ok=True)
+            chapter_name = str(chapter_id).rjust(5, "0")
+            file_name = os.path.join(dir_name, chapter_name + ".json")
+            with open(file_name, "wb") as fp:
+                fp.write(zlib.decompress(data))
+
+        return len(rows)
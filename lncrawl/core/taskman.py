@@ -3,16 +3,27 @@ import os
 import signal
 import threading
 from abc import ABC
-from concurrent.futures import Future, ThreadPoolExecutor
-from typing import Generator, List, TypeVar
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 from tqdm import tqdm
 
-from .exeptions import LNException
+from .exeptions import AbortedException, LNException
 
 logger = logging.getLogger(__name__)
 
 MAX_WORKER_COUNT = 10
+MIN_SAMPLES_TO_ABORT = 20
 
 T = TypeVar("T")
 
@@ -45,6 +56,21 @@ class TaskManager(ABC):
                 future.cancel()
 
     def resolve_futures(self, futures: List[Future], desc="", unit="") -> None:
+        for _ in self.resolve_as_generator(futures, desc=desc, unit=unit):
+            pass
+
+    def resolve_as_generator(
+        self,
+        futures: List[Future],
+        desc="",
+        unit="",
+        fail_fast=False,
+    ) -> Generator[T, None, None]:
+        """
+        Yields the results of the futures in the order they were submitted.
+        Failed futures are logged and skipped, unless `fail_fast` is set, in
+        which case the first error is raised and the rest are cancelled.
+        """
         if not futures:
             return
 
@@ -68,15 +94,110 @@ class TaskManager(ABC):
         try:
             for future in futures:
                 try:
-                    future.result()
+                    result = future.result()
                 except KeyboardInterrupt as e:
                     raise e
                 except Exception as e:
+                    if fail_fast:
+                        raise e
                     message = f"{e.__class__.__name__}: {e}"
                     if message and not is_debug_mode:
                         bar.clear()
                         logger.warning(message)
+                    continue
                 finally:
                     bar.update()
+                yield result
         finally:
             _cancel()
+
+    def resolve_in_window(
+        self,
+        fn: Callable[[T], Any],
+        items: Iterable[T],
+        window: int = 0,
+        desc="",
+        unit="",
+        max_failure_rate: Optional[float] = None,
+    ) -> List[Tuple[T, Exception]]:
+        """
+        Calls `fn` for every item in the executor, keeping only `window` tasks
+        in flight at a time, and consumes the results as they complete.
+
+        If `max_failure_rate` is given, stops submitting new items once the
+        ratio of failed tasks crosses it. Returns the failed items with their
+        errors, including the ones that were never attempted.
+        """
+        if window <= 0:
+            window = 2 * self.executor._max_workers
+
+        total = len(items) if hasattr(items, "__len__") else None
+        items = iter(items)
+        is_debug_mode = os.getenv("debug_mode") == "yes"
+        bar = tqdm(
+            desc=desc,
+            unit=unit,
+            total=total,
+            disable=is_debug_mode,
+        )
+
+        pending: Dict[Future, T] = {}
+        failed: List[Tuple[T, Exception]] = []
+        completed = 0
+        aborted = False
+
+        def _cancel(*args):
+            bar.close()
+            self.cancel_futures(list(pending.keys()))
+            if len(args):
+                raise LNException("Cancelled by user")
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, _cancel)
+
+        try:
+            while True:
+                while not aborted and len(pending) < window:
+                    item = next(items, StopIteration)
+                    if item is StopIteration:
+                        break
+                    pending[self.executor.submit(fn, item)] = item
+
+                if not pending:
+                    break
+
+                done, _ = wait(list(pending.keys()), return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    completed += 1
+                    bar.update()
+                    try:
+                        future.result()
+                    except KeyboardInterrupt as e:
+                        raise e
+                    except Exception as e:
+                        failed.append((item, e))
+                        message = f"{e.__class__.__name__}: {e}"
+                        if message and not is_debug_mode:
+                            bar.clear()
+                            logger.warning(message)
+
+                if (
+                    not aborted
+                    and max_failure_rate is not None
+                    and completed >= MIN_SAMPLES_TO_ABORT
+                    and len(failed) > max_failure_rate * completed
+                ):
+                    aborted = True
+                    bar.clear()
+                    logger.error(
+                        "Aborting: %d of %d tasks have failed", len(failed), completed
+                    )
+
+            if aborted:
+                error = AbortedException("Aborted due to too many failures")
+                failed += [(item, error) for item in items]
+        finally:
+            _cancel()
+
+        return failed
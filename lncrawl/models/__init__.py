@@ -1,5 +1,6 @@
 from .chapter import Chapter
 from .formats import OutputFormat
+from .image import ImageProfile, ImageReport
 from .meta import MetaInfo
 from .novel import Novel, NovelStatus
 from .search_result import CombinedSearchResult, SearchResult
@@ -10,6 +11,8 @@ __all__ = [
     "Chapter",
     "CombinedSearchResult",
     "SearchResult",
+    "ImageProfile",
+    "ImageReport",
     "OutputFormat",
     "Novel",
     "NovelStatus",
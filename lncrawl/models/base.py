@@ -0,0 +1,59 @@
+import json
+from inspect import signature
+from typing import Optional, Type, TypeVar
+
+T = TypeVar("T", bound="Model")
+
+
+class Model(dict):
+    """
+    A dict with attribute access to its keys.
+
+    Unlike `box.Box`, it keeps no per-instance state besides the dict itself,
+    and nested values are stored and returned as they are.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value) -> None:
+        self[name] = value
+
+    def __delattr__(self, name: str) -> None:
+        try:
+            del self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict.__repr__(self)})"
+
+    def copy(self: T) -> T:
+        result = dict.__new__(self.__class__)
+        dict.update(result, self)
+        return result
+
+    @classmethod
+    def from_dict(cls: Type[T], data: dict) -> T:
+        """Creates a model from a dict, keeping the keys it does not know"""
+        params = signature(cls.__init__).parameters
+        result = cls(**{k: v for k, v in data.items() if k in params})
+        dict.update(result, data)
+        return result
+
+    def to_json(
+        self,
+        filename: Optional[str] = None,
+        encoding: str = "utf-8",
+        **kwargs,
+    ) -> Optional[str]:
+        kwargs.setdefault("ensure_ascii", False)
+        if not filename:
+            return json.dumps(self, **kwargs)
+        with open(filename, "w", encoding=encoding) as fp:
+            json.dump(self, fp, **kwargs)
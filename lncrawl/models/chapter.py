@@ -1,9 +1,11 @@
 from typing import Dict, Optional
 
-from box import Box
+from .base import Model
 
 
-class Chapter(Box):
+class Chapter(Model):
+    __slots__ = ()
+
     def __init__(
         self,
         id: int,
@@ -21,7 +23,7 @@ class Chapter(Box):
         self.volume = volume
         self.volume_title = volume_title
         self.body = body
-        self.images = images
+        self.images = dict(images)  # the default one is shared
         self.success = success
 
     @staticmethod
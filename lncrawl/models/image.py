@@ -0,0 +1,39 @@
+from .base import Model
+
+
+class ImageProfile(Model):
+    __slots__ = ()
+
+    def __init__(
+        self,
+        max_width: int = 0,  # 0 for no limit
+        max_height: int = 0,  # 0 for no limit
+        grayscale: bool = False,
+        quality: int = 75,
+        image_format: str = "JPEG",  # or WEBP
+    ) -> None:
+        self.max_width = max_width
+        self.max_height = max_height
+        self.grayscale = grayscale
+        self.quality = quality
+        self.image_format = image_format
+
+
+class ImageReport(Model):
+    __slots__ = ()
+
+    def __init__(
+        self,
+        action: str = "",  # passthrough or encoded
+        source_bytes: int = 0,
+        output_bytes: int = 0,
+        source_size: tuple = (0, 0),
+        output_size: tuple = (0, 0),
+        seconds: float = 0,
+    ) -> None:
+        self.action = action
+        self.source_bytes = source_bytes
+        self.output_bytes = output_bytes
+        self.source_size = source_size
+        self.output_size = output_size
+        self.seconds = seconds
@@ -1,12 +1,13 @@
 from typing import Optional
 
-from box import Box
-
+from .base import Model
 from .novel import Novel
 from .session import Session
 
 
-class MetaInfo(Box):
+class MetaInfo(Model):
+    __slots__ = ()
+
     def __init__(
         self,
         novel: Optional[Novel] = None,
@@ -1,8 +1,7 @@
 from enum import Enum
 from typing import List, Optional
 
-from box import Box
-
+from .base import Model
 from .chapter import Chapter
 from .volume import Volume
 from ..assets.languages import language_codes
@@ -15,7 +14,9 @@ class NovelStatus(str, Enum):
     hiatus = "Hiatus"
 
 
-class Novel(Box):
+class Novel(Model):
+    __slots__ = ()
+
     def __init__(
         self,
         url: str,
@@ -1,9 +1,11 @@
 from typing import List
 
-from box import Box
+from .base import Model
 
 
-class SearchResult(Box):
+class SearchResult(Model):
+    __slots__ = ()
+
     def __init__(
         self,
         title: str,
@@ -15,7 +17,9 @@ class SearchResult(Box):
         self.info = info
 
 
-class CombinedSearchResult(Box):
+class CombinedSearchResult(Model):
+    __slots__ = ()
+
     def __init__(
         self,
         id: str,
@@ -1,11 +1,12 @@
 from typing import Dict, List, Optional, Tuple
 
-from box import Box
-
+from .base import Model
 from .formats import OutputFormat
 
 
-class Session(Box):
+class Session(Model):
+    __slots__ = ()
+
     def __init__(
         self,
         user_input: str = "",
@@ -20,6 +21,7 @@ class Session(Box):
         headers: Dict[str, str] = dict(),
         cookies: Dict[str, str] = dict(),
         proxies: Dict[str, str] = dict(),
+        failed_chapters: Dict[int, List[str]] = dict(),
     ) -> None:
         self.user_input = user_input
         self.output_path = output_path
@@ -33,3 +35,4 @@ class Session(Box):
         self.headers = headers
         self.cookies = cookies
         self.proxies = proxies
+        self.failed_chapters = failed_chapters
@@ -1,9 +1,11 @@
 from typing import Optional
 
-from box import Box
+from .base import Model
 
 
-class Volume(Box):
+class Volume(Model):
+    __slots__ = ()
+
     def __init__(
         self,
         id: int,
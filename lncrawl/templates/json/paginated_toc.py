@@ -0,0 +1,66 @@
+from abc import abstractmethod
+from typing import Generator, Iterable
+
+from ...core.crawler import Crawler
+from ...models import Chapter
+
+
+class PaginatedJsonTemplate(Crawler):
+    is_template = True
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.__dict__.get("is_template"):
+            return
+        if (
+            cls.generate_page_jsons is PaginatedJsonTemplate.generate_page_jsons
+            and cls.generate_page_urls is PaginatedJsonTemplate.generate_page_urls
+        ):
+            raise TypeError(
+                f"{cls.__name__} must implement "
+                "either generate_page_urls or generate_page_jsons"
+            )
+
+    def parse_chapter_list(self, data: dict) -> None:
+        for _ in self.generate_chapter_list(data):
+            pass
+
+    def generate_chapter_list(self, data: dict) -> Generator[Chapter, None, None]:
+        for page in self.generate_page_jsons(data):
+            items = self.select_chapter_items(page)
+            for item in items:
+                next_id = len(self.chapters) + 1
+                chapter = self.parse_chapter_item(item, next_id)
+                self.chapters.append(chapter)
+                yield chapter
+
+    def generate_page_jsons(self, data: dict) -> Generator[dict, None, None]:
+        """Generate json data for each chapter list pages"""
+        futures = [
+            self.executor.submit(self.get_json, url)
+            for url in self.generate_page_urls(data)
+        ]
+        yield from self.resolve_as_generator(
+            futures,
+            desc="TOC",
+            unit="page",
+            fail_fast=True,
+        )
+
+    def generate_page_urls(self, data: dict) -> Iterable[str]:
+        """
+        Generate urls of all chapter list pages. The pages are downloaded
+        concurrently and parsed in order. Not required if you override the
+        `generate_page_jsons` instead, which is checked when subclassing.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def select_chapter_items(self, data: dict) -> Iterable[dict]:
+        """Select chapter list items from a chapter list page data"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def parse_chapter_item(self, item: dict, id: int) -> Chapter:
+        """Parse a single chapter from chapter list item"""
+        raise NotImplementedError()
@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 import time
-from concurrent.futures import Future
-from typing import Generator, Iterable, List
+from typing import Generator, Iterable
 from urllib.parse import parse_qs, urlencode, urlparse
 
 from bs4 import BeautifulSoup, Tag
@@ -62,15 +61,12 @@ class NovelMTLTemplate(SearchableSoupTemplate, PaginatedSoupTemplate):
             ]
         )
 
-    def generate_page_soups(
-        self, soup: BeautifulSoup
-    ) -> Generator[BeautifulSoup, None, None]:
+    def generate_page_urls(self, soup: BeautifulSoup) -> Generator[str, None, None]:
         last_page = soup.select("#chapters .pagination li a")[-1]["href"]
         last_page_qs = parse_qs(urlparse(last_page).query)
         max_page = int(last_page_qs["page"][0])
         wjm = last_page_qs["wjm"][0]
 
-        futures: List[Future] = []
         for i in range(max_page + 1):
             payload = {
                 "page": i,
@@ -78,14 +74,7 @@ class NovelMTLTemplate(SearchableSoupTemplate, PaginatedSoupTemplate):
                 "_": self.cur_time,
                 "X-Requested-With": "XMLHttpRequest",
             }
-            url = f"{self.home_url}e/extend/fy.php?{urlencode(payload)}"
-            f = self.executor.submit(self.get_soup, url)
-            futures.append(f)
-
-        self.resolve_futures(futures, desc="TOC", unit="page")
-        for i, future in enumerate(futures):
-            assert future.done(), f"Failed to get page {i + 1}"
-            yield future.result()
+            yield f"{self.home_url}e/extend/fy.php?{urlencode(payload)}"
 
     def select_chapter_tags(self, soup: BeautifulSoup) -> Iterable[Tag]:
         return soup.select("ul.chapter-list li a")
@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from typing import Generator, Optional
 
 from bs4 import BeautifulSoup, Tag
 
@@ -10,17 +11,30 @@ class GeneralSoupTemplate(Crawler):
     is_template = True
 
     def read_novel_info(self) -> None:
+        for _ in self.stream_novel_info():
+            pass
+
+    def stream_novel_info(self) -> Generator[Chapter, None, None]:
         soup = self.get_soup(self.novel_url)
         self.parse_title(soup)
         self.parse_cover(soup)
         self.parse_authors(soup)
-        self.parse_chapter_list(soup)
+        yield from self.generate_chapter_list(soup)
 
     def download_chapter_body(self, chapter: Chapter) -> str:
         soup = self.get_soup(chapter.url)
         body = self.select_chapter_body(soup)
         return self.cleaner.extract_contents(body)
 
+    def download_chapter_tag(self, chapter: Chapter) -> Optional[Tag]:
+        if (
+            type(self).download_chapter_body
+            is not GeneralSoupTemplate.download_chapter_body
+        ):
+            return None  # the crawler downloads the body in its own way
+        soup = self.get_soup(chapter.url)
+        return self.select_chapter_body(soup)
+
     @abstractmethod
     def parse_title(self, soup: BeautifulSoup) -> None:
         """Parse and set the novel title"""
@@ -41,6 +55,13 @@ class GeneralSoupTemplate(Crawler):
         """Parse and set the volumes and chapters"""
         raise NotImplementedError()
 
+    def generate_chapter_list(
+        self, soup: BeautifulSoup
+    ) -> Generator[Chapter, None, None]:
+        """Parse the volumes and chapters, and yield chapters as they are found"""
+        self.parse_chapter_list(soup)
+        yield from self.chapters
+
     @abstractmethod
     def select_chapter_body(self, soup: BeautifulSoup) -> Tag:
         """Select the tag containing the chapter text"""
@@ -10,19 +10,55 @@ from .general import GeneralSoupTemplate
 class PaginatedSoupTemplate(GeneralSoupTemplate):
     is_template = True
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.__dict__.get("is_template"):
+            return
+        if (
+            cls.generate_page_soups is PaginatedSoupTemplate.generate_page_soups
+            and cls.generate_page_urls is PaginatedSoupTemplate.generate_page_urls
+        ):
+            raise TypeError(
+                f"{cls.__name__} must implement "
+                "either generate_page_urls or generate_page_soups"
+            )
+
     def parse_chapter_list(self, soup: BeautifulSoup) -> None:
+        for _ in self.generate_chapter_list(soup):
+            pass
+
+    def generate_chapter_list(
+        self, soup: BeautifulSoup
+    ) -> Generator[Chapter, None, None]:
         for page in self.generate_page_soups(soup):
             tags = self.select_chapter_tags(page)
             for tag in tags:
                 next_id = len(self.chapters) + 1
                 item = self.parse_chapter_item(tag, next_id)
                 self.chapters.append(item)
+                yield item
 
-    @abstractmethod
     def generate_page_soups(
         self, soup: BeautifulSoup
     ) -> Generator[BeautifulSoup, None, None]:
         """Generate soups for each chapter list pages"""
+        futures = [
+            self.executor.submit(self.get_soup, url)
+            for url in self.generate_page_urls(soup)
+        ]
+        yield from self.resolve_as_generator(
+            futures,
+            desc="TOC",
+            unit="page",
+            fail_fast=True,
+        )
+
+    def generate_page_urls(self, soup: BeautifulSoup) -> Iterable[str]:
+        """
+        Generate urls of all chapter list pages. The pages are downloaded
+        concurrently and parsed in order. Not required if you override the
+        `generate_page_soups` instead, which is checked when subclassing.
+        """
         raise NotImplementedError()
 
     @abstractmethod
@@ -0,0 +1,192 @@
+"""
+To create zip archives of the output folders
+"""
+import logging
+import os
+import sys
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEVEL = 6
+# The compression level of the zip files can be set since python 3.7
+ZIP_HAS_COMPRESSLEVEL = sys.version_info >= (3, 7)
+# The attributes of ZipFile used to write the compressed entries as they are
+RAW_ENTRY_INTERNALS = ["_lock", "_didModify", "start_dir", "filelist", "NameToInfo"]
+ARCHIVE_WORKERS = min(4, os.cpu_count() or 1)
+ARCHIVE_AHEAD_PER_WORKER = 4
+# Bigger files are compressed while writing, instead of in parallel in memory
+MAX_PARALLEL_FILE_SIZE = 4 * 1024 * 1024
+
+# Compressing these again only costs time
+STORED_EXTENSIONS = {
+    ".7z",
+    ".azw3",
+    ".docx",
+    ".epub",
+    ".gif",
+    ".gz",
+    ".jpeg",
+    ".jpg",
+    ".mobi",
+    ".pdf",
+    ".png",
+    ".rar",
+    ".webp",
+    ".zip",
+}
+
+
+def open_zip_writer(file_name: str, level: int = DEFAULT_LEVEL) -> zipfile.ZipFile:
+    """
+    Opens a zip file to write deflated entries with the given level. The
+    default level of zlib, which is 6, is used on older python versions.
+    """
+    if ZIP_HAS_COMPRESSLEVEL:
+        return zipfile.ZipFile(
+            file_name, "w", zipfile.ZIP_DEFLATED, compresslevel=level
+        )
+    return zipfile.ZipFile(file_name, "w", zipfile.ZIP_DEFLATED)
+
+
+def can_write_raw_entry(target: zipfile.ZipFile) -> bool:
+    """
+    Whether `write_raw_entry` can be used. It writes through the internals of
+    zipfile, which are not the same in every python version. Use the public
+    methods of zipfile otherwise.
+    """
+    return (
+        all(hasattr(target, name) for name in RAW_ENTRY_INTERNALS)
+        and hasattr(zipfile.ZipInfo, "FileHeader")
+        and not getattr(target, "_writing", False)
+    )
+
+
+def write_raw_entry(
+    target: zipfile.ZipFile,
+    zinfo: zipfile.ZipInfo,
+    chunks: Iterable[bytes],
+) -> None:
+    """
+    Writes an entry whose data is already compressed. The CRC, sizes and the
+    compression type must be set in `zinfo`. Check `can_write_raw_entry` first.
+    """
+    assert target.fp, "Archive is not open"
+    zip64 = max(zinfo.file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT
+    with target._lock:
+        zinfo.header_offset = target.fp.tell()
+        target.fp.write(zinfo.FileHeader(zip64))
+        for chunk in chunks:
+            target.fp.write(chunk)
+        target.filelist.append(zinfo)
+        target.NameToInfo[zinfo.filename] = zinfo
+        target.start_dir = target.fp.tell()
+        target._didModify = True
+
+
+def compress_file(path: str, zinfo: zipfile.ZipInfo, level: int) -> bytes:
+    """Reads a file and compresses it with raw deflate, as it is in zip files"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    zinfo.file_size = len(data)
+    zinfo.CRC = zlib.crc32(data)
+    if zinfo.compress_type == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        if len(compressed) < len(data):
+            zinfo.compress_size = len(compressed)
+            return compressed
+        zinfo.compress_type = zipfile.ZIP_STORED
+
+    zinfo.compress_size = len(data)
+    return data
+
+
+def iter_archive_members(root_dir: str) -> Iterator[Tuple[str, str]]:
+    """Yields (path, name in archive) of every folder and file, like `shutil`"""
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames.sort()
+        arcdirpath = os.path.normpath(os.path.relpath(dirpath, root_dir))
+        for name in dirnames:
+            yield os.path.join(dirpath, name), os.path.join(arcdirpath, name)
+        for name in sorted(filenames):
+            path = os.path.normpath(os.path.join(dirpath, name))
+            if os.path.isfile(path):
+                yield path, os.path.normpath(os.path.join(arcdirpath, name))
+
+
+def make_zip_archive(
+    base_name: str,
+    root_dir: str,
+    level: Optional[int] = None,
+    workers: int = ARCHIVE_WORKERS,
+) -> str:
+    """
+    Creates `base_name.zip` with all contents of the `root_dir`, like
+    `shutil.make_archive(base_name, "zip", root_dir)`, but faster:
+
+    - Files that are compressed already, e.g. epub and jpg, are stored.
+    - Small files are compressed in parallel, and written in order as soon
+      as they are ready. Only a few of them are kept in memory.
+    - The rest are streamed to the archive meanwhile.
+    """
+    if level is None:
+        level = DEFAULT_LEVEL
+    zip_filename = os.path.abspath(base_name + ".zip")
+    os.makedirs(os.path.dirname(zip_filename), exist_ok=True)
+
+    try:
+        __write_archive(zip_filename, root_dir, level, workers)
+    except BaseException:
+        if os.path.isfile(zip_filename):
+            os.remove(zip_filename)  # do not leave a broken archive behind
+        raise
+    return zip_filename
+
+
+def __write_archive(zip_filename: str, root_dir: str, level: int, workers: int):
+    window = max(1, workers) * ARCHIVE_AHEAD_PER_WORKER
+    pending: Deque[Tuple[zipfile.ZipInfo, Future]] = deque()
+
+    def _write_next(zf: zipfile.ZipFile):
+        zinfo, future = pending.popleft()
+        write_raw_entry(zf, zinfo, [future.result()])
+
+    with ThreadPoolExecutor(
+        max(1, workers), thread_name_prefix="lncrawl_zip"
+    ) as executor, open_zip_writer(zip_filename, level) as zf:
+        parallel = can_write_raw_entry(zf)
+        try:
+            for path, arcname in iter_archive_members(root_dir):
+                ext = os.path.splitext(path)[1].lower()
+                compress_type = zipfile.ZIP_DEFLATED
+                if level == 0 or ext in STORED_EXTENSIONS:
+                    compress_type = zipfile.ZIP_STORED
+
+                # Streamed to the file right away by zipfile
+                if (
+                    not parallel
+                    or os.path.isdir(path)
+                    or compress_type == zipfile.ZIP_STORED
+                    or os.path.getsize(path) > MAX_PARALLEL_FILE_SIZE
+                ):
+                    zf.write(path, arcname, compress_type)
+                    continue
+
+                zinfo = zipfile.ZipInfo.from_file(path, arcname)
+                zinfo.compress_type = compress_type
+                future = executor.submit(compress_file, path, zinfo, level)
+                pending.append((zinfo, future))
+                if len(pending) >= window:
+                    _write_next(zf)
+
+            while pending:
+                _write_next(zf)
+        finally:
+            for _, future in pending:
+                future.cancel()
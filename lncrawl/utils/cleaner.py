@@ -145,6 +145,10 @@ class TextCleaner:
 
     def extract_contents(self, tag) -> str:
         self.clean_contents(tag)
+        return self.join_paragraphs(tag)
+
+    def join_paragraphs(self, tag) -> str:
+        """Serializes a cleaned tag as paragraphs"""
         body = self.extract_paragraphs(tag)
         paragraphs = " ".join(body).split(LINE_SEP)
         return "".join(
@@ -0,0 +1,66 @@
+import logging
+import os
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # not available on windows
+
+logger = logging.getLogger(__name__)
+
+# ioctl to share the data blocks of a file on btrfs, xfs etc. in linux
+FICLONE = 0x40049409
+
+
+def is_same_file(src_file: str, dst_file: str) -> bool:
+    """Checks if the destination is a link or an unmodified copy of the source"""
+    try:
+        src, dst = os.stat(src_file), os.stat(dst_file)
+    except OSError:
+        return False
+    if (src.st_dev, src.st_ino) == (dst.st_dev, dst.st_ino):
+        return True
+    return src.st_size == dst.st_size and src.st_mtime_ns == dst.st_mtime_ns
+
+
+def reflink_file(src_file: str, dst_file: str) -> bool:
+    """Makes a copy-on-write clone of the file, if the filesystem supports it"""
+    if not fcntl:
+        return False
+    try:
+        with open(src_file, "rb") as src, open(dst_file, "xb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(src_file, dst_file)
+        return True
+    except OSError:
+        if os.path.isfile(dst_file):
+            os.remove(dst_file)
+        return False
+
+
+def link_file(src_file: str, dst_file: str) -> None:
+    """
+    Makes the source file available at the destination without copying its
+    bytes when possible: it tries a hardlink first, then a reflink, and
+    copies it at last. Nothing is done if the same file is already there.
+    """
+    if is_same_file(src_file, dst_file):
+        return
+
+    # Created aside and moved in place, so that an existing link to the
+    # source is never written into, and parallel calls do not conflict.
+    tmp_file = "%s.%d-%d.tmp" % (dst_file, os.getpid(), threading.get_ident())
+    try:
+        os.link(src_file, tmp_file)
+    except OSError as e:
+        logger.debug("Can not hardlink %s: %s", src_file, e)
+        if not reflink_file(src_file, tmp_file):
+            shutil.copy2(src_file, tmp_file)  # keeps the mtime to find it the same
+
+    try:
+        os.replace(tmp_file, dst_file)
+    except OSError:
+        os.remove(tmp_file)
+        raise
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Measure the time to archive a synthetic multi-format output folder with
+`shutil.make_archive` and with the archiver used by `App.compress_books`.
+
+Usage: python scripts/bench_archive.py [chapter_count] [level]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+try:
+    path = os.path.realpath(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+    from lncrawl.utils.archive import ARCHIVE_WORKERS, make_zip_archive
+except ImportError:
+    print("Failed to import lncrawl")
+    exit(1)
+
+CHAPTERS_PER_VOLUME = 100
+IMAGES_PER_VOLUME = 20
+IMAGE_SIZE = 200 * 1024
+
+
+def make_output(root: str, count: int):
+    paragraph = (
+        "<p>The quick brown fox jumps over the lazy dog, and then "
+        "<b>runs away</b> into the <i>forest</i> before anyone notices.</p>\n"
+    )
+    body = paragraph * 120
+    volumes = 1 + (count - 1) // CHAPTERS_PER_VOLUME
+    for vol in range(1, volumes + 1):
+        name = f"Volume {vol}"
+        chapters = range(
+            (vol - 1) * CHAPTERS_PER_VOLUME + 1,
+            min(count, vol * CHAPTERS_PER_VOLUME) + 1,
+        )
+
+        # Images are incompressible, like jpeg files
+        image_dir = os.path.join(root, "web", name, "images")
+        os.makedirs(image_dir)
+        images = [os.urandom(IMAGE_SIZE) for _ in range(IMAGES_PER_VOLUME)]
+        for i, image in enumerate(images):
+            with open(os.path.join(image_dir, f"{i}.jpg"), "wb") as f:
+                f.write(image)
+
+        for fmt, ext in [("web", "html"), ("text", "txt"), ("json", "json")]:
+            dir_name = os.path.join(root, fmt, name)
+            os.makedirs(dir_name, exist_ok=True)
+            for i in chapters:
+                with open(os.path.join(dir_name, f"{i:05}.{ext}"), "w") as f:
+                    f.write(f"<h1>Chapter {i}</h1>\n{body}")
+
+        os.makedirs(os.path.join(root, "epub"), exist_ok=True)
+        epub_file = os.path.join(root, "epub", f"{name}.epub")
+        with zipfile.ZipFile(epub_file, "w", zipfile.ZIP_DEFLATED) as zf:
+            for i in chapters:
+                zf.writestr(f"EPUB/chapters/{i}.xhtml", body)
+            for i, image in enumerate(images):
+                zf.writestr(f"EPUB/images/{i}.jpg", image)
+
+
+def entries(zip_file: str):
+    with zipfile.ZipFile(zip_file) as zf:
+        return sorted((info.filename, info.CRC) for info in zf.infolist())
+
+
+def measure(name: str, root: str, archive) -> list:
+    start = time.perf_counter()
+    size = 0
+    archives = []
+    for fmt in sorted(os.listdir(root)):
+        base_name = os.path.join(root + "-" + name, fmt)
+        archives.append(archive(base_name, os.path.join(root, fmt)))
+        size += os.path.getsize(archives[-1])
+    elapsed = time.perf_counter() - start
+    print("%-8s | %7.3f s | %8.2f MB" % (name, elapsed, size / 1024 / 1024))
+    return [entries(x) for x in archives]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    level = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+
+    output_path = tempfile.mkdtemp()
+    try:
+        root = os.path.join(output_path, "output")
+        make_output(root, count)
+        print("Chapters: %d | level: %d | workers: %d" % (count, level, ARCHIVE_WORKERS))
+        expected = measure(
+            "shutil",
+            root,
+            lambda base, root_dir: shutil.make_archive(base, "zip", root_dir),
+        )
+        actual = measure(
+            "lncrawl",
+            root,
+            lambda base, root_dir: make_zip_archive(base, root_dir, level),
+        )
+        assert expected == actual, "The archives have different contents"
+    finally:
+        shutil.rmtree(output_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
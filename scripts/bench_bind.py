@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Measure the time to bind a large synthetic novel into epub, rendering the
+chapters inline and in worker processes.
+
+Usage: python scripts/bench_bind.py [chapter_count] [workers]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+try:
+    path = os.path.realpath(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+    from lncrawl.binders import render
+    from lncrawl.binders.epub import bind_epub_book
+    from lncrawl.models import Chapter
+    from lncrawl.utils.imgen import generate_cover_image
+except ImportError:
+    print("Failed to import lncrawl")
+    exit(1)
+
+CHAPTERS_PER_VOLUME = 100
+PARAGRAPHS_PER_CHAPTER = 120
+
+
+def make_chapters(count: int):
+    paragraph = (
+        "<p>  The quick brown fox jumps over the lazy dog, and then   "
+        "<b>runs away</b> into the <i>forest</i> before anyone notices.  </p>\n"
+    )
+    groups = []
+    for i in range(1, count + 1):
+        volume = 1 + (i - 1) // CHAPTERS_PER_VOLUME
+        if len(groups) < volume:
+            groups.append([])
+        groups[-1].append(
+            Chapter(
+                id=i,
+                title=f"Chapter {i}",
+                volume=volume,
+                volume_title=f"Volume {volume}",
+                body=f"<h1>Chapter {i}</h1>\n" + paragraph * PARAGRAPHS_PER_CHAPTER,
+            )
+        )
+    return groups
+
+
+def measure(name: str, workers: int, groups, output_path: str, cover: str):
+    render.RENDER_WORKERS = workers
+    start = time.perf_counter()
+    bind_epub_book(
+        chapter_groups=groups,
+        images=[],
+        book_title="Benchmark",
+        novel_author="Nobody",
+        output_path=output_path,
+        book_cover=cover,
+        novel_title="Benchmark",
+        novel_url="https://example.com",
+        good_file_name="benchmark",
+        suffix=name,
+    )
+    print("%-8s | workers: %2d | %7.3f s" % (name, workers, time.perf_counter() - start))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else render.RENDER_WORKERS
+
+    output_path = tempfile.mkdtemp()
+    try:
+        cover = os.path.join(output_path, "cover.jpg")
+        generate_cover_image(cover)
+        groups = make_chapters(count)
+        print("Chapters:", count)
+        measure("inline", 1, groups, output_path, cover)
+        measure("parallel", max(2, workers), groups, output_path, cover)
+    finally:
+        shutil.rmtree(output_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Compare memory and speed of the novel models against the python-box
+based ones over a large synthetic table of contents.
+
+Usage: python scripts/bench_models.py [chapter_count]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+try:
+    path = os.path.realpath(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+    from lncrawl.models import Chapter, Volume
+except ImportError:
+    print("Failed to import lncrawl")
+    exit(1)
+
+try:
+    from box import Box
+except ImportError:
+    Box = None
+
+CHAPTERS_PER_VOLUME = 100
+
+
+def make_box_models():
+    class BoxChapter(Box):
+        def __init__(
+            self,
+            id: int,
+            url: str = "",
+            title: str = "",
+            volume: Optional[int] = None,
+            volume_title: Optional[str] = None,
+            body: Optional[str] = None,
+            images: Dict[str, str] = dict(),
+            success: bool = False,
+        ) -> None:
+            self.id = id
+            self.url = url
+            self.title = title
+            self.volume = volume
+            self.volume_title = volume_title
+            self.body = body
+            self.images = images
+            self.success = success
+
+    class BoxVolume(Box):
+        def __init__(self, id: int, title: str = "") -> None:
+            self.id = id
+            self.title = title
+            self.start_chapter = None
+            self.final_chapter = None
+            self.chapter_count = None
+
+    return BoxChapter, BoxVolume
+
+
+def build_toc(ChapterType, VolumeType, count: int) -> List:
+    volumes = {}
+    chapters = []
+    for i in range(1, count + 1):
+        vol_id = 1 + (i - 1) // CHAPTERS_PER_VOLUME
+        if vol_id not in volumes:
+            volumes[vol_id] = VolumeType(id=vol_id, title=f"Volume {vol_id}")
+            volumes[vol_id].chapter_count = 0
+        chapter = ChapterType(
+            id=i,
+            url=f"https://example.com/novel/chapter-{i}",
+            title=f"Chapter {i}: The quick brown fox jumps over the lazy dog",
+        )
+        # similar to what format_novel does to every chapter
+        volume = volumes[vol_id]
+        chapter.volume = volume.id
+        chapter.volume_title = volume.title
+        chapter.title = chapter.title.strip()
+        volume.chapter_count += 1
+        chapters.append(chapter)
+    return chapters
+
+
+def scan_toc(chapters: List) -> int:
+    # similar to the loops in bind_books and the binders
+    total = 0
+    for chapter in chapters:
+        if chapter["success"] or chapter.get("body") is None:
+            total += chapter.id + chapter["volume"]
+            total += len(chapter.title) + len(chapter["url"])
+    return total
+
+
+def measure(name: str, fn: Callable[[], List]) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    chapters = fn()
+    build_time = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(5):
+        scan_toc(chapters)
+    scan_time = (time.perf_counter() - start) / 5
+
+    print(
+        "%-8s | memory: %8.2f MB | build: %7.3f s | scan: %7.3f s"
+        % (name, memory / 1024 / 1024, build_time, scan_time)
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print("Chapters:", count)
+    measure("models", lambda: build_toc(Chapter, Volume, count))
+    if Box:
+        BoxChapter, BoxVolume = make_box_models()
+        measure("box", lambda: build_toc(BoxChapter, BoxVolume, count))
+    else:
+        print("python-box is not installed. Skipped comparing with it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 import logging
 import re
-from concurrent import futures
+from concurrent.futures import Future
+from typing import Generator, Iterable
 
 import js2py
 from bs4 import BeautifulSoup
 
-from lncrawl.core.crawler import Crawler
+from lncrawl.models import Chapter
+from lncrawl.templates.json.paginated_toc import PaginatedJsonTemplate
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +16,7 @@ login_url = "https://lnmtl.com/auth/login"
 logout_url = "https://lnmtl.com/auth/logout"
 
 
-class LNMTLCrawler(Crawler):
+class LNMTLCrawler(PaginatedJsonTemplate):
     machine_translation = True
     base_url = "https://lnmtl.com/"
 
@@ -58,6 +60,10 @@ class LNMTLCrawler(Crawler):
 
     def read_novel_info(self):
         """get list of chapters"""
+        for _ in self.stream_novel_info():
+            pass
+
+    def stream_novel_info(self) -> Generator[Chapter, None, None]:
         logger.info("Visiting %s", self.novel_url)
         soup = self.get_soup(self.novel_url)
 
@@ -77,7 +83,7 @@ class LNMTLCrawler(Crawler):
         self.volumes = sorted(self.volumes, key=lambda x: x["id"])
 
         logger.info("Getting chapters...")
-        self.download_chapter_list()
+        yield from self.generate_chapter_list({"volumes": self.volumes})
 
     def parse_volume_list(self, soup):
         self.volumes = []
@@ -104,49 +110,57 @@ class LNMTLCrawler(Crawler):
         if len(self.volumes) == 0:
             raise Exception("Failed parsing volume list")
 
-    def download_chapter_list(self):
-        futures_to_wait = [
-            self.executor.submit(self.download_chapters_per_volume, volume)
-            for volume in self.volumes
-        ]
+    def generate_page_jsons(self, data: dict) -> Generator[dict, None, None]:
+        volumes = data["volumes"]
 
-        possible_chapters = {}
-        for future in futures.as_completed(futures_to_wait):
-            vol_id, chapters = future.result()
-            possible_chapters[vol_id] = chapters
+        # First pages tell the page count of each volume
+        futures = [
+            self.executor.submit(self.get_json, self.volume_page_url(volume, 1))
+            for volume in volumes
+        ]
+        first_pages = self.resolve_as_generator(
+            futures, desc="TOC", unit="volume", fail_fast=True
+        )
 
-        for volume in self.volumes:
-            for chapter in possible_chapters[volume["id"]]:
-                chap = chapter.copy()
-                chap["id"] = len(self.chapters) + 1
-                chap["volume"] = volume["id"]
-                self.chapters.append(chap)
+        # Get the rest of the pages of all volumes together, in order
+        page_volumes = []
+        futures = []
+        for volume, page in zip(volumes, first_pages):
+            first = Future()
+            first.set_result(page)  # already downloaded
+            futures.append(first)
+            page_volumes.append(volume["id"])
+            for index in range(2, page["last_page"] + 1):
+                url = self.volume_page_url(volume, index)
+                futures.append(self.executor.submit(self.get_json, url))
+                page_volumes.append(volume["id"])
+
+        pages = self.resolve_as_generator(
+            futures, desc="TOC", unit="page", fail_fast=True
+        )
+        for vol_id, page in zip(page_volumes, pages):
+            page["volume"] = vol_id
+            yield page
 
-    def download_chapters_per_volume(self, volume, page=1):
-        url = self.absolute_url(
+    def volume_page_url(self, volume, page):
+        return self.absolute_url(
             f"/chapter?page={page}&volumeId={volume['download_id']}"
         )
-        logger.info("Getting json: %s", url)
-        result = self.get_json(url)
-
-        chapters = []
-        for chapter in result["data"]:
-            title = chapter.get("title") or ""
-            if chapter.get("number"):
-                title = f"#{chapter.get('number')} {title}"
-            chapters.append(
-                {
-                    "title": title,
-                    "url": chapter["site_url"],
-                }
-            )
 
-        if page != 1:
-            return chapters
-
-        for page in range(2, result["last_page"] + 1):
-            chapters += self.download_chapters_per_volume(volume, page)
-        return volume["id"], chapters
+    def select_chapter_items(self, data: dict) -> Iterable[dict]:
+        for item in data["data"]:
+            yield dict(item, volume=data["volume"])
+
+    def parse_chapter_item(self, item: dict, id: int) -> Chapter:
+        title = item.get("title") or ""
+        if item.get("number"):
+            title = f"#{item.get('number')} {title}"
+        return Chapter(
+            id=id,
+            volume=item["volume"],
+            title=title,
+            url=item["site_url"],
+        )
 
     def download_chapter_body(self, chapter):
         soup = self.get_soup(chapter["url"])
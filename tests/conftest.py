@@ -0,0 +1,40 @@
+import sys
+
+import pytest
+
+from lncrawl.core.app import App
+from lncrawl.core.crawler import Crawler
+from lncrawl.core.store import ChapterStore
+
+
+@pytest.fixture(autouse=True, scope="session")
+def default_args():
+    # `get_args` parses the command line of pytest otherwise
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(sys, "argv", sys.argv[:1])
+        yield
+
+
+class DummyCrawler(Crawler):
+    base_url = ["https://example.com/"]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fetched = []
+
+    def read_novel_info(self) -> None:
+        pass
+
+    def download_chapter_body(self, chapter) -> str:
+        self.fetched.append(chapter["id"])
+        return "<p>Body of %d</p>" % chapter["id"]
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = App()
+    app.crawler = DummyCrawler()
+    app.output_path = str(tmp_path)
+    app.store = ChapterStore(app.output_path)
+    yield app
+    app.destroy()
@@ -0,0 +1,60 @@
+import os
+import zipfile
+
+import pytest
+
+from lncrawl.utils import archive
+from lncrawl.utils.archive import make_zip_archive
+
+
+class ZipFileWithoutLevel(zipfile.ZipFile):
+    """The zip file of python 3.6, which does not take a compression level"""
+
+    def __init__(self, file, mode="r", compression=zipfile.ZIP_STORED):
+        super().__init__(file, mode, compression)
+
+
+@pytest.fixture
+def root_dir(tmp_path):
+    root_dir = tmp_path / "web"
+    (root_dir / "images").mkdir(parents=True)
+    (root_dir / "images" / "a.jpg").write_bytes(b"jpg" * 100)
+    for i in range(20):
+        (root_dir / ("%05d.html" % i)).write_text("<p>Chapter %d</p>" % i * 50)
+    return str(root_dir)
+
+
+def read_archive(file_name):
+    with zipfile.ZipFile(file_name) as zf:
+        assert zf.testzip() is None
+        return {x.filename: zf.read(x) for x in zf.infolist() if not x.is_dir()}
+
+
+def read_folder(root_dir):
+    files = {}
+    for dirpath, _, filenames in os.walk(root_dir):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as fp:
+                files[os.path.relpath(path, root_dir).replace(os.sep, "/")] = fp.read()
+    return files
+
+
+def test_archive_has_every_file(root_dir, tmp_path):
+    file_name = make_zip_archive(str(tmp_path / "out"), root_dir)
+    assert read_archive(file_name) == read_folder(root_dir)
+
+
+def test_archive_without_compression_level(root_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "ZIP_HAS_COMPRESSLEVEL", False)
+    monkeypatch.setattr(zipfile, "ZipFile", ZipFileWithoutLevel)
+    file_name = make_zip_archive(str(tmp_path / "out"), root_dir, level=9)
+    monkeypatch.undo()
+    assert read_archive(file_name) == read_folder(root_dir)
+
+
+def test_archive_without_raw_entries(root_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "RAW_ENTRY_INTERNALS", ["_not_in_zipfile"])
+    monkeypatch.setattr(archive, "write_raw_entry", None)  # must not be used
+    file_name = make_zip_archive(str(tmp_path / "out"), root_dir)
+    assert read_archive(file_name) == read_folder(root_dir)
@@ -0,0 +1,150 @@
+import os
+import zipfile
+
+import pytest
+
+from lncrawl.binders import web
+from lncrawl.binders.epub_writer import EpubStreamWriter
+from lncrawl.utils import archive
+from lncrawl.core.downloader import download_chapter_body
+from lncrawl.models import Chapter, Volume
+
+
+def download(app, count):
+    app.crawler.novel_title = "Dummy"
+    app.crawler.novel_url = "https://example.com/novel"
+    app.crawler.volumes = [Volume(id=1, title="Volume 1")]
+    app.crawler.chapters = [
+        Chapter(id=i, volume=1, title="Chapter %d" % i) for i in range(1, count + 1)
+    ]
+    app.chapters = app.crawler.chapters
+    for chapter in app.chapters:
+        download_chapter_body(app, chapter)
+    app.store.flush()
+
+
+class ZipFileWithoutLevel(zipfile.ZipFile):
+    """The zip file of python 3.6, which does not take a compression level"""
+
+    def __init__(self, file, mode="r", compression=zipfile.ZIP_STORED):
+        super().__init__(file, mode, compression)
+
+
+def use_zip_without_level(monkeypatch):
+    monkeypatch.setattr(archive, "ZIP_HAS_COMPRESSLEVEL", False)
+    monkeypatch.setattr(zipfile, "ZipFile", ZipFileWithoutLevel)
+
+
+def list_dir(app, *path):
+    return sorted(os.listdir(os.path.join(app.output_path, *path)))
+
+
+def test_new_chapters_update_the_previous_books(app, monkeypatch):
+    app.good_file_name = "Dummy"
+    app.book_cover = os.path.join(app.output_path, "cover.jpg")
+    with open(app.book_cover, "wb") as fp:
+        fp.write(b"cover")
+    app.output_formats = {"epub": True, "text": True, "web": True}
+
+    download(app, 10)
+    app.bind_books()
+    assert list_dir(app, "epub") == ["Dummy c1-10.epub"]
+    assert list_dir(app, "text") == ["c1-10"]
+    assert list_dir(app, "web") == ["c1-10"]
+
+    copied = []
+    copy_item = EpubStreamWriter.copy_item
+
+    def _copy_item(self, item, previous):
+        copied.append(item.file_name)
+        return copy_item(self, item, previous)
+
+    monkeypatch.setattr(EpubStreamWriter, "copy_item", _copy_item)
+    download(app, 12)
+    app.chapters = [x for x in app.chapters if x.id != 5]  # removed from the TOC
+    app.bind_books()
+
+    assert list_dir(app, "epub") == ["Dummy c1-12.epub"]
+    assert list_dir(app, "text") == ["c1-12"]
+    assert list_dir(app, "web") == ["c1-12"]
+    assert "00005.txt" not in list_dir(app, "text", "c1-12")
+    assert len(list_dir(app, "text", "c1-12")) == 11
+    assert "00005.html" not in list_dir(app, "web", "c1-12")
+    assert sorted(copied) == sorted(
+        "chapters/%d.xhtml" % i for i in range(1, 11) if i != 5
+    )
+
+
+@pytest.mark.parametrize("pack_by_volume", [False, True])
+def test_failed_chapters_are_bound_with_their_title(app, monkeypatch, pack_by_volume):
+    def _fail(chapter):
+        raise ValueError("failed")
+
+    monkeypatch.setattr(app.crawler, "download_chapter_body", _fail)
+    with pytest.raises(ValueError):
+        download(app, 1)
+    app.crawler.volumes[0].update(start_chapter=1, final_chapter=1)
+    app.pack_by_volume = pack_by_volume
+    app.output_formats = {"text": True}
+    app.bind_books()
+
+    dir_name = "Chapter 1-1" if pack_by_volume else "c1-1"
+    file_name = os.path.join(app.output_path, "text", dir_name, "00001.txt")
+    with open(file_name, encoding="utf8") as fp:
+        assert fp.read() == "Chapter 1"
+
+
+def test_epub_is_bound_without_compression_level(app, monkeypatch):
+    use_zip_without_level(monkeypatch)
+    app.good_file_name = "Dummy"
+    app.book_cover = os.path.join(app.output_path, "cover.jpg")
+    with open(app.book_cover, "wb") as fp:
+        fp.write(b"cover")
+    app.output_formats = {"epub": True}
+
+    download(app, 3)
+    app.bind_books()
+    with zipfile.ZipFile(
+        os.path.join(app.output_path, "epub", "Dummy c1-3.epub")
+    ) as zf:
+        assert zf.testzip() is None
+        assert "EPUB/chapters/3.xhtml" in zf.namelist()
+
+
+def test_unchanged_web_pages_are_not_built_again(app, monkeypatch):
+    app.output_formats = {"web": True}
+    download(app, 5)
+    app.bind_books()
+
+    built = []
+    build_html_chapter = web.build_html_chapter
+
+    def _build_html_chapter(chapters, index, *args):
+        built.append(chapters[index].id)
+        return build_html_chapter(chapters, index, *args)
+
+    monkeypatch.setattr(web, "build_html_chapter", _build_html_chapter)
+    download(app, 6)
+    app.bind_books()
+    assert built == [5, 6]  # the link to the next page of the 5th has changed
+    assert len(list_dir(app, "web", "c1-6")) == 6 + 4  # with the assets and images
+
+
+def test_epub_entries_are_copied_without_raw_entries(app, monkeypatch):
+    monkeypatch.setattr(archive, "RAW_ENTRY_INTERNALS", ["_not_in_zipfile"])
+    app.good_file_name = "Dummy"
+    app.book_cover = os.path.join(app.output_path, "cover.jpg")
+    with open(app.book_cover, "wb") as fp:
+        fp.write(b"cover")
+    app.output_formats = {"epub": True}
+
+    download(app, 3)
+    app.bind_books()
+    download(app, 4)
+    app.bind_books()
+    with zipfile.ZipFile(
+        os.path.join(app.output_path, "epub", "Dummy c1-4.epub")
+    ) as zf:
+        assert zf.testzip() is None
+        assert b"Body of 1" in zf.read("EPUB/chapters/1.xhtml")
+        assert b"Body of 4" in zf.read("EPUB/chapters/4.xhtml")
@@ -0,0 +1,42 @@
+from lncrawl.core.downloader import download_chapters, escalated_strategy
+from lncrawl.models import Chapter
+
+
+def test_skipped_chapters_are_not_retried_or_fetched_again(app, monkeypatch):
+    app.crawler.init_executor(1)
+    app.chapters = [
+        Chapter(
+            id=i, volume=1, title="Chapter %d" % i, url="https://example.com/%d" % i
+        )
+        for i in range(1, 41)
+    ]
+    for chapter in app.chapters[30:]:
+        app.store.put(Chapter(id=chapter.id, body="<p>stored</p>", success=True))
+
+    # Every chapter fails once, so the first pass is aborted
+    download_chapter_body = app.crawler.download_chapter_body
+
+    def _fail_once(chapter):
+        if chapter["id"] not in app.crawler.fetched:
+            app.crawler.fetched.append(chapter["id"])
+            raise ValueError("failed once")
+        return download_chapter_body(chapter)
+
+    monkeypatch.setattr(app.crawler, "download_chapter_body", _fail_once)
+    download_chapters(app)
+
+    assert not app.failed_chapters
+    assert all(chapter.success for chapter in app.chapters)
+    assert not set(app.crawler.fetched) & set(range(31, 41))
+    # the skipped chapters fail in their first pass and are retried once
+    assert sorted(app.crawler.fetched) == sorted(list(range(1, 31)) * 2)
+
+
+def test_escalated_strategy_is_reverted(app):
+    app.crawler.use_browser = True  # enabled by the source itself
+    timeout = app.crawler.request_timeout
+    for attempt in range(1, 5):
+        with escalated_strategy(app, attempt, []):
+            assert app.crawler.request_timeout != timeout
+        assert app.crawler.request_timeout == timeout
+        assert app.crawler.use_browser
@@ -0,0 +1,84 @@
+import os
+
+from lncrawl.core import downloader
+from lncrawl.core.downloader import (
+    check_image_profile,
+    discard_failed_images,
+    download_content_image,
+)
+from lncrawl.core.image_pipeline import IMAGE_PROFILES
+from lncrawl.models import Chapter
+
+
+def use_profile(monkeypatch, name, webp=False):
+    def _get_image_profile():
+        profile = IMAGE_PROFILES[name].copy()
+        if webp:
+            profile.image_format = "WEBP"
+        return profile
+
+    monkeypatch.setattr(downloader, "get_image_profile", _get_image_profile)
+
+
+def save_image(app):
+    file_name = os.path.join(app.output_path, "images", "a.jpg")
+    with open(file_name, "wb") as f:
+        f.write(b"image")
+    return file_name
+
+
+def test_images_are_processed_again_for_another_profile(app, monkeypatch):
+    use_profile(monkeypatch, "original")
+    check_image_profile(app)
+    image = save_image(app)
+
+    use_profile(monkeypatch, "original", webp=True)
+    check_image_profile(app)
+    assert os.path.isfile(image)  # the format is kept by the names
+
+    use_profile(monkeypatch, "kindle")
+    check_image_profile(app)
+    assert not os.path.isfile(image)
+
+    image = save_image(app)
+    check_image_profile(app)
+    assert os.path.isfile(image)
+
+
+def test_failed_images_are_discarded_once(app):
+    chapter = Chapter(
+        id=1,
+        body='<p><img src="images/a.jpg" alt="a.jpg"><img src="images/b.jpg" alt="b.jpg"></p>',
+        images={"a.jpg": "http://a", "b.jpg": "http://b"},
+        success=True,
+    )
+    discard_failed_images(app, chapter, ["a.jpg"])
+    discard_failed_images(app, chapter, ["a.jpg"])  # from the other pass
+
+    assert chapter["images"] == {"b.jpg": "http://b"}
+    assert chapter["body"] == '<p><img src="images/b.jpg" alt="b.jpg"></p>'
+    assert app.store.get(1)["images"] == {"b.jpg": "http://b"}
+
+
+class EvictedCache:
+    """Loses every image as soon as it is put"""
+
+    def get(self, key):
+        return None
+
+    def put(self, key, data):
+        return os.path.join(os.path.dirname(__file__), "evicted.jpg")
+
+
+def test_image_is_saved_when_evicted_from_cache(app, monkeypatch):
+    use_profile(monkeypatch, "original")
+    monkeypatch.setattr(downloader, "get_image_cache", EvictedCache)
+    monkeypatch.setattr(downloader, "download_image_data", lambda app, url: b"data")
+    monkeypatch.setattr(downloader, "prepare_image", lambda data, p: (data, "ok"))
+
+    image_folder = os.path.join(app.output_path, "images")
+    download_content_image(app, "http://a", "a.jpg", image_folder)
+
+    with open(os.path.join(image_folder, "a.jpg"), "rb") as f:
+        assert f.read() == b"data"
+    assert app.image_reports["a.jpg"] == "ok"
@@ -0,0 +1,66 @@
+import os
+
+from lncrawl import constants as C
+from lncrawl.core.downloader import download_chapter_body
+from lncrawl.core.novel_info import journal_chapter, load_metadata, save_metadata
+from lncrawl.models import Chapter, Volume
+
+
+def prepare(app, count):
+    app.crawler.novel_title = "Dummy"
+    app.crawler.novel_url = "https://example.com/novel"
+    app.crawler.volumes = [Volume(id=1, title="Volume 1")]
+    app.crawler.chapters = [
+        Chapter(id=i, volume=1, title="Chapter %d" % i) for i in range(1, count + 1)
+    ]
+    app.chapters = app.crawler.chapters
+
+
+def read_journal(app):
+    app.journal.flush()
+    file_name = os.path.join(app.output_path, C.META_JOURNAL_FILE_NAME)
+    with open(file_name, encoding="utf-8") as fp:
+        return fp.readlines()
+
+
+def test_changes_are_replayed(app):
+    prepare(app, 3)
+    save_metadata(app)
+    app.chapters[1]["success"] = True
+    app.chapters[1]["images"] = {"a.jpg": "http://a"}
+    journal_chapter(app, app.chapters[1])
+
+    meta = load_metadata(os.path.join(app.output_path, C.META_FILE_NAME))
+    chapters = {x.id: x for x in meta.novel.chapters}
+    assert chapters[2].success and chapters[2].images == {"a.jpg": "http://a"}
+    assert not chapters[1].get("success") and not chapters[3].get("success")
+
+
+def test_unchanged_chapters_are_not_journaled(app):
+    prepare(app, 3)
+    save_metadata(app)
+    for chapter in app.chapters:
+        journal_chapter(app, chapter)
+    assert read_journal(app) == []
+
+    app.chapters[0]["success"] = True
+    journal_chapter(app, app.chapters[0])
+    journal_chapter(app, app.chapters[0])
+    assert len(read_journal(app)) == 1
+
+
+def test_resume_journals_only_new_chapters(app):
+    prepare(app, 3)
+    save_metadata(app)
+    for chapter in app.chapters:
+        download_chapter_body(app, chapter)
+    assert len(read_journal(app)) == 3
+
+    # resumed with one more chapter
+    app.store.flush()
+    prepare(app, 4)
+    save_metadata(app)
+    for chapter in app.chapters:
+        download_chapter_body(app, chapter)
+    assert len(read_journal(app)) == 1
+    assert app.crawler.fetched == [1, 2, 3, 4]
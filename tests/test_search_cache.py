@@ -0,0 +1,83 @@
+import logging
+import time
+
+import pytest
+
+from lncrawl.core import search_cache
+from lncrawl.core.search_cache import MAX_STALE_RATIO, SearchCache, normalize_query
+
+RESULTS = [{"title": "Dummy", "url": "https://example.com/novel"}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.db"), 1024 * 1024)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [time.time()]
+    monkeypatch.setattr(search_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_normalize_query():
+    assert normalize_query("  The   Novel\t") == "the novel"
+    assert normalize_query("ＴＨＥ Ｎｏｖｅｌ") == "the novel"  # full width
+    assert normalize_query("Straße") == normalize_query("STRASSE")
+    assert normalize_query(None) == ""
+
+
+def test_results_are_kept_by_source_and_query(cache):
+    cache.put("https://a.com/", "The Novel", RESULTS)
+    assert cache.get("https://a.com/", "the  novel", 60) == (RESULTS, False)
+    assert cache.get("https://b.com/", "the novel", 60) is None
+    assert cache.get("https://a.com/", "another novel", 60) is None
+
+
+def test_results_become_stale_then_expire(cache, clock):
+    cache.put("https://a.com/", "novel", RESULTS)
+    clock[0] += 30
+    assert cache.get("https://a.com/", "novel", 60) == (RESULTS, False)
+    clock[0] += 60
+    assert cache.get("https://a.com/", "novel", 60) == (RESULTS, True)
+    clock[0] += 60 * MAX_STALE_RATIO
+    assert cache.get("https://a.com/", "novel", 60) is None
+    clock[0] -= 60 * MAX_STALE_RATIO  # the expired entry is removed
+    assert cache.get("https://a.com/", "novel", 60) is None
+
+
+def test_least_recently_used_are_evicted(tmp_path, clock):
+    results = [
+        {"title": "Novel %d" % i, "url": "https://a.com/%d" % i} for i in range(50)
+    ]
+    size = len(search_cache.zlib.compress(search_cache.json.dumps(results).encode()))
+    cache = SearchCache(str(tmp_path / "search.db"), size * 3)
+    for query in ["one", "two", "three"]:
+        clock[0] += 1
+        cache.put("https://a.com/", query, results)
+    clock[0] += 1
+    assert cache.get("https://a.com/", "one", 60)  # used again
+
+    clock[0] += 1
+    cache.put("https://a.com/", "four", results)
+    assert cache.get("https://a.com/", "two", 60) is None
+    assert cache.get("https://a.com/", "one", 60)
+    assert cache.get("https://a.com/", "four", 60)
+    cache.close()
+
+
+def test_stats_are_counted_by_source(cache, clock, caplog):
+    cache.put("https://a.com/", "novel", RESULTS)
+    cache.get("https://a.com/", "novel", 60)
+    cache.get("https://a.com/", "other", 60)
+    clock[0] += 120
+    cache.get("https://a.com/", "novel", 60)
+    cache.get("https://b.com/", "novel", 60)
+    assert cache.stats == {"https://a.com/": [1, 1, 1], "https://b.com/": [0, 0, 1]}
+
+    with caplog.at_level(logging.INFO, logger=search_cache.logger.name):
+        cache.log_stats()
+    assert "1 hits, 1 stale, 2 misses [50% hit rate]" in caplog.text
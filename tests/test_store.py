@@ -0,0 +1,84 @@
+import json
+import os
+import sqlite3
+import zlib
+
+from lncrawl.core.downloader import download_chapter_body
+from lncrawl.core.store import STORE_FILE_NAME, ChapterStore
+from lncrawl.models import Chapter
+
+
+def test_put_and_get(tmp_path):
+    store = ChapterStore(str(tmp_path))
+    store.put(Chapter(id=1, body="<p>one</p>", success=True))
+    store.put(Chapter(id=2, body="", success=False))
+    store.flush()
+
+    assert 1 in store and 2 not in store
+    assert store.has(2)
+    assert store.get(1)["body"] == "<p>one</p>"
+    store.close()
+
+    store = ChapterStore(str(tmp_path))
+    assert 1 in store and len(store) == 2
+    bodies = store.iter_bodies([Chapter(id=2), Chapter(id=1)])
+    assert [(x.id, body) for x, body in bodies] == [(2, ""), (1, "<p>one</p>")]
+    store.close()
+
+
+def test_images_are_read_without_body(tmp_path):
+    store = ChapterStore(str(tmp_path))
+    store.put(Chapter(id=1, body="<p>one</p>", images={"a.jpg": "http://a"}))
+    assert store.get_images(1) == {"a.jpg": "http://a"}  # still queued
+    store.flush()
+    store.get = None  # the body must not be decompressed
+    assert store.get_images(1) == {"a.jpg": "http://a"}
+    store.close()
+
+
+def test_images_of_rows_stored_before_the_column(tmp_path):
+    db = sqlite3.connect(os.path.join(tmp_path, STORE_FILE_NAME))
+    db.execute(
+        "CREATE TABLE chapters (id INTEGER PRIMARY KEY, volume INTEGER, "
+        "success INTEGER NOT NULL DEFAULT 0, data BLOB NOT NULL)"
+    )
+    data = json.dumps({"id": 1, "body": "x", "images": {"a.jpg": "http://a"}})
+    db.execute(
+        "INSERT INTO chapters VALUES (1, 1, 1, ?)", (zlib.compress(data.encode()),)
+    )
+    db.commit()
+    db.close()
+
+    store = ChapterStore(str(tmp_path))
+    assert 1 in store
+    assert store.get_images(1) == {"a.jpg": "http://a"}
+    store.close()
+
+
+def test_stored_chapter_is_not_downloaded_or_rewritten(app):
+    app.store.put(
+        Chapter(id=1, title="One", body="<p>one</p>", images={}, success=True)
+    )
+    app.store.flush()
+
+    written = []
+    app.store.put = written.append
+    app.store.get = None  # the body must not be read either
+
+    chapter = Chapter(id=1, title="One", url="https://example.com/1")
+    download_chapter_body(app, chapter)
+
+    assert app.crawler.fetched == []
+    assert written == []
+    assert chapter.success and chapter.body is None
+    assert app.progress == 1
+
+
+def test_new_chapter_is_downloaded_and_stored(app):
+    chapter = Chapter(id=2, title="Two", url="https://example.com/2")
+    download_chapter_body(app, chapter)
+    app.store.flush()
+
+    assert app.crawler.fetched == [2]
+    assert 2 in app.store
+    assert "Body of 2" in app.store.get(2)["body"]
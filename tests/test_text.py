@@ -0,0 +1,31 @@
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from lncrawl.assets.chars import Chars
+from lncrawl.binders.text import html_to_text
+
+SAMPLES = [
+    "<h1>Title</h1>\n<p>One &amp; <b>two</b></p><p>  three  </p>",
+    "<p>Before</p><![CDATA[Inside the CDATA]]><p>After</p>",
+    "<p>Text<![CDATA[ with <b>markup</b> ]]></p>",
+    "<p>Kept</p><![if !IE]><p>Shown</p><![endif]><!-- comment -->",
+    "<p>Text</p><script>var x = 1;</script><style>p {}</style>",
+]
+
+
+@pytest.mark.parametrize("html", SAMPLES)
+def test_text_is_same_as_soup(html):
+    soup = BeautifulSoup(html, "html.parser")
+    text = "\n\n".join(soup.stripped_strings)
+    assert html_to_text(html) == re.sub(r"[\r\n]+", Chars.EOL + Chars.EOL, text)
+
+
+def test_cdata_is_kept():
+    html = "<p>Before</p><![CDATA[Inside the CDATA]]><p>After</p>"
+    assert html_to_text(html).split(Chars.EOL * 2) == [
+        "Before",
+        "Inside the CDATA",
+        "After",
+    ]